@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Optional
+
+try:
+    from .graph import Graph, Vertex
+except ImportError:
+    from graph import Graph, Vertex
+
+# Offsets index into the neighbour arrays, so they need the wider type.
+OFFSET_TYPECODE = "q"
+VERTEX_TYPECODE = "i"
+WEIGHT_TYPECODE = "d"
+
+
+class CSRGraph:
+    """An immutable undirected graph in compressed sparse row form.
+
+    Vertices are the integers ``0..n-1``. The neighbours of ``v`` are
+    ``targets[offsets[v]:offsets[v + 1]]`` with the matching ``weights``, and
+    every edge is stored once in each direction.
+    """
+
+    __slots__ = ("_offsets", "_targets", "_weights", "_labels")
+
+    def __init__(self, offsets: Sequence[int], targets: Sequence[int], weights: Sequence[float],
+                 labels: Optional[Sequence[str]] = None) -> None:
+        if len(offsets) < 1 or offsets[-1] != len(targets):
+            raise ValueError("offsets must end with the number of neighbour entries")
+        if len(targets) != len(weights):
+            raise ValueError("targets and weights must have the same length")
+        if labels is not None and len(labels) != len(offsets) - 1:
+            raise ValueError("there must be exactly one label per vertex")
+
+        object.__setattr__(self, "_offsets", offsets)
+        object.__setattr__(self, "_targets", targets)
+        object.__setattr__(self, "_weights", weights)
+        object.__setattr__(self, "_labels", labels)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self) -> tuple:
+        # Arrays may be views of a memory map or of NumPy arrays, so they are
+        # pickled as copies.
+        labels = None if self._labels is None else list(self._labels)
+        return self.__class__, (_copy_array(OFFSET_TYPECODE, self._offsets),
+                                _copy_array(VERTEX_TYPECODE, self._targets),
+                                _copy_array(WEIGHT_TYPECODE, self._weights), labels)
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(vertices={self.num_vertices()}, edges={self.num_edges()})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    @classmethod
+    def from_edges(cls, n: int, edges: Iterable[tuple[int, int, float]],
+                   labels: Optional[Sequence[str]] = None) -> CSRGraph:
+        """Builds a graph on the vertices 0..n-1 from (u, v, weight) triples.
+
+        Args:
+            n (int): The number of vertices.
+            edges (Iterable[tuple[int, int, float]]): The undirected edges.
+            labels (Sequence[str], optional): A label for each vertex.
+
+        Returns:
+            CSRGraph: The graph.
+        """
+        us, vs = array(VERTEX_TYPECODE), array(VERTEX_TYPECODE)
+        ws = array(WEIGHT_TYPECODE)
+        for u, v, w in edges:
+            us.append(u)
+            vs.append(v)
+            ws.append(w)
+        return cls.from_arrays(n, us, vs, ws, labels)
+
+    @classmethod
+    def from_graph(cls, g: Graph) -> CSRGraph:
+        """Builds a CSR copy of a ``graph.Graph``.
+
+        Vertex ids follow the order of ``g.vertices`` and the vertex labels are kept.
+
+        Args:
+            g (Graph): The graph to copy.
+
+        Returns:
+            CSRGraph: The graph.
+        """
+        vertices = g.vertices
+        index = {v: i for i, v in enumerate(vertices)}
+        edges = ((index[e.vertex_1], index[e.vertex_2], e.weight) for e in g.edges)
+        return cls.from_edges(len(vertices), edges, [v.label for v in vertices])
+
+    @classmethod
+    def from_numpy(cls, offsets, targets, weights, labels: Optional[Sequence[str]] = None) -> CSRGraph:
+        """Builds a graph by copying NumPy offset, neighbour and weight arrays.
+
+        Returns:
+            CSRGraph: The graph.
+        """
+        return cls(_array_from_numpy(OFFSET_TYPECODE, offsets), _array_from_numpy(VERTEX_TYPECODE, targets),
+                   _array_from_numpy(WEIGHT_TYPECODE, weights), labels)
+
+    def to_numpy(self):
+        """Returns the offsets, targets and weights as NumPy arrays that share memory with this graph.
+
+        Nothing is copied, so for a graph opened with graph_file.read_csr the
+        arrays are views of the memory-mapped file.
+        """
+        import numpy as np
+
+        return tuple(np.frombuffer(a, dtype=a.typecode if isinstance(a, array) else a.format)
+                     for a in (self._offsets, self._targets, self._weights))
+
+    def to_graph(self) -> Graph:
+        """Builds a ``graph.Graph`` copy of this graph.
+
+        Vertices are labelled as by ``label`` and edge (u, v) is labelled "u-v".
+
+        Returns:
+            Graph: The graph.
+        """
+        return Graph.from_edge_list([Vertex(self.label(v)) for v in self.vertices], self.edges())
+
+    @classmethod
+    def from_arrays(cls, n: int, us: Sequence[int], vs: Sequence[int], ws: Sequence[float],
+                    labels: Optional[Sequence[str]] = None) -> CSRGraph:
+        """Builds a graph from parallel arrays of edge endpoints and weights.
+
+        Args:
+            n (int): The number of vertices.
+            us (Sequence[int]): The first endpoint of each edge.
+            vs (Sequence[int]): The second endpoint of each edge.
+            ws (Sequence[float]): The weight of each edge.
+            labels (Sequence[str], optional): A label for each vertex.
+
+        Returns:
+            CSRGraph: The graph.
+        """
+        # Counting sort on the source vertex, with each edge stored in both directions.
+        offsets = array(OFFSET_TYPECODE, bytes(array(OFFSET_TYPECODE).itemsize * (n + 1)))
+        for u, v in zip(us, vs):
+            if not (0 <= u < n and 0 <= v < n):
+                raise ValueError(f"Edge ({u}, {v}) is out of range for {n} vertices")
+            offsets[u + 1] += 1
+            offsets[v + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        nnz = offsets[n]
+        targets = array(VERTEX_TYPECODE, bytes(array(VERTEX_TYPECODE).itemsize * nnz))
+        weights = array(WEIGHT_TYPECODE, bytes(array(WEIGHT_TYPECODE).itemsize * nnz))
+        fill = offsets[:-1]
+        for u, v, w in zip(us, vs, ws):
+            i = fill[u]
+            targets[i], weights[i] = v, w
+            fill[u] = i + 1
+            i = fill[v]
+            targets[i], weights[i] = u, w
+            fill[v] = i + 1
+        return cls(offsets, targets, weights, labels)
+
+    @property
+    def offsets(self) -> Sequence[int]:
+        return self._offsets
+
+    @property
+    def targets(self) -> Sequence[int]:
+        return self._targets
+
+    @property
+    def weights(self) -> Sequence[float]:
+        return self._weights
+
+    @property
+    def labels(self) -> Optional[Sequence[str]]:
+        return self._labels
+
+    @property
+    def vertices(self) -> range:
+        return range(self.num_vertices())
+
+    def num_vertices(self) -> int:
+        return len(self._offsets) - 1
+
+    def num_edges(self) -> int:
+        return len(self._targets) // 2
+
+    def label(self, v: int) -> str:
+        """Returns the label of vertex v, or its id as a string if the graph is unlabelled."""
+        return str(v) if self._labels is None else self._labels[v]
+
+    def degree(self, v: int) -> int:
+        return self._offsets[v + 1] - self._offsets[v]
+
+    def neighbours(self, v: int) -> Iterator[tuple[int, float]]:
+        """Iterates over the (neighbour, weight) pairs of vertex v."""
+        start, end = self._offsets[v], self._offsets[v + 1]
+        return zip(self._targets[start:end], self._weights[start:end])
+
+    def edges(self) -> Iterator[tuple[int, int, float]]:
+        """Iterates over every edge once as a (u, v, weight) triple with u < v."""
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+        for u in range(self.num_vertices()):
+            for i in range(offsets[u], offsets[u + 1]):
+                if u < targets[i]:
+                    yield u, targets[i], weights[i]
+
+
+def _array_from_numpy(typecode: str, a) -> array:
+    out = array(typecode)
+    out.frombytes(a.astype(typecode, copy=False).tobytes())
+    return out
+
+
+def _copy_array(typecode: str, values: Sequence) -> array:
+    if isinstance(values, array):
+        return values
+    a = array(typecode)
+    if isinstance(values, memoryview) and values.format == typecode:
+        a.frombytes(values)
+    else:
+        a.extend(values)
+    return a
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import csv
+import os
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Optional
+
+try:
+    from .csr import CSRGraph, VERTEX_TYPECODE, WEIGHT_TYPECODE
+except ImportError:
+    from csr import CSRGraph, VERTEX_TYPECODE, WEIGHT_TYPECODE
+
+# Edge lists are read as a pipeline of chunks so that only one chunk of parsed
+# rows exists at a time. Interned edges are appended to compact arrays, 16
+# bytes per edge, and no Vertex or Edge objects are ever created.
+#
+# A binary edge list is a sequence of little-endian (u: int64, v: int64, w: float64) records.
+RECORD_SIZE = 24
+CHUNK_SIZE = 1 << 16
+
+
+class EdgeListError(Exception):
+    pass
+
+
+def read_delimited(path: str | os.PathLike, delimiter: Optional[str] = None,
+                   chunk_size: int = CHUNK_SIZE, skip_header: bool = False) -> Iterator[list[tuple[str, str, float]]]:
+    """Reads a CSV or TSV edge list in chunks of (u, v, weight) rows.
+
+    Each row is "u, v" or "u, v, weight", with a default weight of 1. Blank
+    lines and lines starting with "#" are skipped.
+
+    Args:
+        path (str | os.PathLike): The file to read.
+        delimiter (str, optional): The field separator. Defaults to a tab for
+            .tsv files and a comma otherwise.
+        chunk_size (int, optional): The number of rows per chunk.
+        skip_header (bool, optional): Whether the first line is a header.
+    """
+    if delimiter is None:
+        delimiter = "\t" if str(path).endswith(".tsv") else ","
+
+    # csv.reader only counts the lines it is given, so the file line number
+    # is tracked here, before blank and comment lines are dropped
+    line_num = 0
+
+    def data_lines(f):
+        nonlocal line_num
+        for line_num, line in enumerate(f, 1):
+            if line.strip() and not line.startswith("#"):
+                yield line
+
+    with open(path, newline="") as f:
+        rows = csv.reader(data_lines(f), delimiter=delimiter)
+        if skip_header:
+            next(rows, None)
+
+        chunk = []
+        for row in rows:
+            if len(row) == 2:
+                chunk.append((row[0].strip(), row[1].strip(), 1.))
+            elif len(row) == 3:
+                try:
+                    weight = float(row[2])
+                except ValueError:
+                    raise EdgeListError(f"Line {line_num} of {path} has a weight that is not a number") from None
+                chunk.append((row[0].strip(), row[1].strip(), weight))
+            else:
+                raise EdgeListError(f"Line {line_num} of {path} does not have 2 or 3 fields")
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def read_binary(path: str | os.PathLike, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple[array, array, array]]:
+    """Reads a binary edge list in chunks of (us, vs, ws) arrays.
+
+    The records are split into columns with strided array slices, so no
+    per-edge Python objects are made.
+    """
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_size * RECORD_SIZE)
+            if not data:
+                break
+            if len(data) % RECORD_SIZE:
+                raise EdgeListError(f"{path} ends with a partial record")
+            ints, floats = array("q"), array("d")
+            ints.frombytes(data)
+            floats.frombytes(data)
+            if sys.byteorder != "little":
+                ints.byteswap()
+                floats.byteswap()
+            yield ints[0::3], ints[1::3], floats[2::3]
+
+
+def write_binary(path: str | os.PathLike, edges: Iterable[tuple[int, int, float]]) -> None:
+    """Writes (u, v, weight) edges as a binary edge list."""
+    with open(path, "wb") as f:
+        for chunk in _chunked(edges, CHUNK_SIZE):
+            ints = array("q", (x for u, v, _ in chunk for x in (u, v, 0)))
+            floats = array("d", (w for _, _, w in chunk))
+            if sys.byteorder != "little":
+                ints.byteswap()
+                floats.byteswap()
+            records = bytearray(ints.tobytes())
+            view = memoryview(records).cast("d")
+            view[2::3] = floats
+            f.write(records)
+
+
+class LabelInterner:
+    """Assigns the integer ids 0, 1, 2, ... to vertex labels in order of first appearance."""
+
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.labels: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def intern(self, label: str) -> int:
+        i = self.ids.get(label)
+        if i is None:
+            i = self.ids[label] = len(self.labels)
+            self.labels.append(label)
+        return i
+
+    def intern_chunks(self, chunks: Iterable[list[tuple[str, str, float]]]) -> Iterator[tuple[array, array, array]]:
+        """Turns chunks of labelled rows into chunks of (us, vs, ws) id arrays."""
+        intern = self.intern
+        for chunk in chunks:
+            yield (array(VERTEX_TYPECODE, (intern(u) for u, _, _ in chunk)),
+                   array(VERTEX_TYPECODE, (intern(v) for _, v, _ in chunk)),
+                   array(WEIGHT_TYPECODE, (w for _, _, w in chunk)))
+
+
+def build_csr(chunks: Iterable[tuple[array, array, array]], n: Optional[int] = None,
+              labels: Optional[list[str]] = None) -> CSRGraph:
+    """Collects chunks of (us, vs, ws) arrays into a CSRGraph.
+
+    Args:
+        chunks (Iterable[tuple[array, array, array]]): The edges.
+        n (int, optional): The number of vertices. Defaults to one more than the largest id.
+        labels (list[str], optional): A label for each vertex.
+    """
+    us, vs, ws = array(VERTEX_TYPECODE), array(VERTEX_TYPECODE), array(WEIGHT_TYPECODE)
+    largest = -1
+    for cu, cv, cw in chunks:
+        if len(cu):
+            largest = max(largest, max(cu), max(cv))
+        # array.extend only accepts arrays of the same type, and binary ids are int64
+        us.extend(cu if _same_type(cu, us) else array(VERTEX_TYPECODE, cu))
+        vs.extend(cv if _same_type(cv, vs) else array(VERTEX_TYPECODE, cv))
+        ws.extend(cw if _same_type(cw, ws) else array(WEIGHT_TYPECODE, cw))
+    if n is None:
+        n = len(labels) if labels is not None else largest + 1
+    return CSRGraph.from_arrays(n, us, vs, ws, labels)
+
+
+def load_csr(path: str | os.PathLike, binary: Optional[bool] = None, delimiter: Optional[str] = None,
+             chunk_size: int = CHUNK_SIZE, skip_header: bool = False) -> CSRGraph:
+    """Streams an edge list file into a CSRGraph.
+
+    Text labels are interned to ids in order of first appearance and kept as
+    the vertex labels. Binary files already hold ids, so they are used as is.
+
+    Args:
+        path (str | os.PathLike): The file to read.
+        binary (bool, optional): Whether the file is a binary edge list. By
+            default, files ending in .bin are binary.
+        delimiter (str, optional): See read_delimited.
+        chunk_size (int, optional): The number of edges read at a time.
+        skip_header (bool, optional): See read_delimited.
+    """
+    if binary is None:
+        binary = str(path).endswith(".bin")
+    if binary:
+        return build_csr(read_binary(path, chunk_size))
+
+    interner = LabelInterner()
+    chunks = interner.intern_chunks(read_delimited(path, delimiter, chunk_size, skip_header))
+    return build_csr(chunks, labels=interner.labels)
+
+
+def _same_type(a, b: array) -> bool:
+    return isinstance(a, array) and a.typecode == b.typecode
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import Optional
+
+try:
+    from .csr import CSRGraph
+except ImportError:
+    from csr import CSRGraph
+
+# Part of the graph cache key. Bump it whenever a change to random_edges,
+# random_csr or main.create_graph changes the graph produced for a seed.
+GENERATOR_VERSION = 1
+
+# Pairs (u, v) with v < u are numbered row by row through the lower triangle,
+# so (u, v) has index u * (u - 1) // 2 + v and there are n * (n - 1) // 2 of them.
+
+
+def _pair_index(u: int, v: int) -> int:
+    return u * (u - 1) // 2 + v
+
+
+def _index_pair(i: int) -> tuple[int, int]:
+    u = (1 + math.isqrt(8 * i + 1)) // 2
+    return u, i - u * (u - 1) // 2
+
+
+def _check_size(n: int, m: int) -> None:
+    if m > ((n * (n - 1)) // 2):
+        raise ValueError(
+            f"Cannot create {m} edges for a graph with {n} nodes.")
+
+
+def random_edges(n: int, m: int, rng: Optional[random.Random] = None) -> list[tuple[int, int]]:
+    """Picks the vertex pairs of a random connected graph without rejection sampling.
+
+    Each vertex i > 0 is first joined to a random earlier vertex, giving a
+    spanning tree. The remaining m - n + 1 edges are drawn uniformly from the
+    pairs that are not tree edges, by sampling their ranks in that set. When
+    more than half of the pairs are wanted, the pairs to leave out are sampled
+    instead.
+
+    Args:
+        n (int): The number of vertices.
+        m (int): The number of edges. At least the n - 1 tree edges are always made.
+        rng (random.Random, optional): The source of randomness.
+
+    Returns:
+        list[tuple[int, int]]: The edges as (u, v) pairs with v < u. The tree comes first.
+    """
+    _check_size(n, m)
+    if rng is None:
+        rng = random.Random(random.getrandbits(64))
+
+    edges = [(u, rng.randrange(u)) for u in range(1, n)]
+    tree = sorted(_pair_index(u, v) for u, v in edges)
+
+    available = n * (n - 1) // 2 - len(tree)
+    k = m - len(tree)
+    if k <= 0:
+        return edges
+
+    if k <= available // 2:
+        ranks = sorted(rng.sample(range(available), k))
+    else:
+        excluded = set(rng.sample(range(available), available - k))
+        ranks = [r for r in range(available) if r not in excluded]
+
+    # The r-th non-tree pair is at index r + (the number of tree indices before it).
+    t = 0
+    for r in ranks:
+        while t < len(tree) and tree[t] <= r + t:
+            t += 1
+        edges.append(_index_pair(r + t))
+    return edges
+
+
+def random_csr(n: int, m: int, seed: Optional[int] = None, max_weight: int = 20) -> CSRGraph:
+    """Vectorised NumPy version of random_edges that builds a CSRGraph directly.
+
+    Weights are drawn uniformly from 1..max_weight, as in main.create_graph.
+
+    Args:
+        n (int): The number of vertices.
+        m (int): The number of edges. At least the n - 1 tree edges are always made.
+        seed (int, optional): Seed for numpy.random.default_rng.
+        max_weight (int, optional): The largest edge weight.
+
+    Returns:
+        CSRGraph: The graph.
+    """
+    import numpy as np
+
+    _check_size(n, m)
+    rng = np.random.default_rng(seed)
+
+    u = np.arange(1, n, dtype=np.int64)
+    v = (rng.random(n - 1) * u).astype(np.int64)
+    tree = np.sort(u * (u - 1) // 2 + v)
+
+    available = n * (n - 1) // 2 - len(tree)
+    k = max(m - len(tree), 0)
+    ranks = np.sort(rng.choice(available, size=k, replace=False))
+    # tree[t] - t is the rank the t-th tree index would have had, see random_edges.
+    extra = ranks + np.searchsorted(tree - np.arange(len(tree)), ranks, side="right")
+
+    index = np.concatenate((tree, extra))
+    u = ((1 + np.sqrt(8 * index + 1)) // 2).astype(np.int64)
+    # Correct any rounding in the square root.
+    u -= u * (u - 1) // 2 > index
+    u += (u + 1) * u // 2 <= index
+    v = index - u * (u - 1) // 2
+    w = rng.integers(1, max_weight + 1, size=len(index)).astype(np.float64)
+
+    sources = np.concatenate((u, v))
+    order = np.argsort(sources, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+    return CSRGraph.from_numpy(offsets, np.concatenate((v, u))[order], np.concatenate((w, w))[order])
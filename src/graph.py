@@ -1,13 +1,36 @@
 from __future__ import annotations
 
+import gc
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Iterable, Iterator, Optional, Union
+
 
 class DoesNotExistError(Exception):
     pass
 
 
+# Vertices and edges are hashed on every dictionary lookup, so both classes use
+# __slots__ and compute their hash once. Labels and endpoints must therefore not
+# be changed after construction. A vertex may belong to several graphs, so the
+# integer ids that Graph gives its vertices are kept in the graph, not on the
+# Vertex.
+
+
 class Vertex:
+    __slots__ = ("label", "_hash")
+
     def __init__(self, label: str = "") -> None:
         self.label = label
+        self._hash = hash(label)
+
+    def __getstate__(self) -> tuple:
+        # String hashes differ between processes, so the hash is not pickled.
+        return (self.label,)
+
+    def __setstate__(self, state: tuple) -> None:
+        self.label, = state
+        self._hash = hash(self.label)
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}({self.label})"
@@ -16,20 +39,32 @@ class Vertex:
         return str(self)
 
     def __hash__(self) -> int:
-        return hash(self.label)
+        return self._hash
 
     def __eq__(self, __value: object) -> bool:
+        if self is __value:
+            return True
         if not isinstance(__value, Vertex):
             raise TypeError
         return self.label == __value.label
 
 
 class Edge:
+    __slots__ = ("vertex_1", "vertex_2", "label", "weight", "_hash")
+
     def __init__(self, vertex_1: Vertex, vertex_2: Vertex, label: str, weight: int) -> None:
         self.vertex_1 = vertex_1
         self.vertex_2 = vertex_2
         self.label = label
         self.weight = weight
+        self._hash = _edge_key_hash(vertex_1, vertex_2, label)
+
+    def __getstate__(self) -> tuple:
+        return self.vertex_1, self.vertex_2, self.label, self.weight
+
+    def __setstate__(self, state: tuple) -> None:
+        self.vertex_1, self.vertex_2, self.label, self.weight = state
+        self._hash = _edge_key_hash(self.vertex_1, self.vertex_2, self.label)
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}({self.label}, {self.vertex_1}, {self.vertex_2}, {self.weight})"
@@ -38,23 +73,105 @@ class Edge:
         return str(self)
 
     def __hash__(self) -> int:
-        return hash(frozenset((self.vertex_1, self.vertex_2, self.label)))
+        return self._hash
 
     def __eq__(self, __value: object) -> bool:
+        if self is __value:
+            return True
         if not isinstance(__value, Edge):
             raise TypeError
-
-        return (self.vertex_1, self.vertex_2, self.label) == (__value.vertex_1, __value.vertex_2, __value.label) \
-            or (self.vertex_2, self.vertex_1, self.label) == (__value.vertex_1, __value.vertex_2, __value.label)
+        if self._hash != __value._hash or self.label != __value.label:
+            return False
+        return (self.vertex_1 == __value.vertex_1 and self.vertex_2 == __value.vertex_2) \
+            or (self.vertex_1 == __value.vertex_2 and self.vertex_2 == __value.vertex_1)
 
     def opposite(self, vertex: Vertex) -> Vertex:
+        if vertex is self.vertex_1:
+            return self.vertex_2
+        if vertex is self.vertex_2:
+            return self.vertex_1
         return self.vertex_2 if vertex == self.vertex_1 else self.vertex_1
 
 
 class Graph:
     def __init__(self,):
-        self._vertices: dict[Vertex, dict[Vertex, Edge]] = {}
-        self._edges: dict[Edge, tuple[Vertex, Vertex]] = {}
+        # Each vertex gets an id when it is added, counting up from 0. Ids of
+        # removed vertices are not reused.
+        self._vertices: dict[Vertex, int] = {}
+        self._vertex_list: list[Optional[Vertex]] = []
+        # The edges of the vertex with id i, keyed by the neighbour's id, or
+        # None once the vertex is removed. Integer keys hash in C, unlike Vertex.
+        self._adjacency: list[Optional[dict[int, Edge]]] = []
+        self._edges: dict[Edge, tuple[int, int]] = {}
+        self._fingerprint = 0
+        # Weight-sorted adjacency by vertex id, built by sorted_adjacency on
+        # first use. An entry is dropped whenever that vertex's edges change.
+        self._sorted: dict[int, list[tuple[float, int, Edge]]] = {}
+
+    @classmethod
+    def from_edge_list(cls, vertices: Union[int, Iterable[Vertex]], edges: Iterable[tuple[int, int, float]]) -> Graph:
+        """Builds a graph from (u, v, weight) triples of vertex indices.
+
+        Args:
+            vertices (int | Iterable[Vertex]): The vertices, or a number n to
+                make the vertices labelled "0" to "n-1". Their ids in the graph
+                are their indices.
+            edges (Iterable[tuple[int, int, float]]): The edges, as indices into
+                vertices. An (m, 3) NumPy array works too. Edge (u, v) is labelled
+                with the labels of its endpoints as "u-v".
+
+        Returns:
+            Graph: The graph.
+        """
+        if isinstance(vertices, int):
+            vertices = [Vertex(str(i)) for i in range(vertices)]
+        else:
+            vertices = list(vertices)
+        if hasattr(edges, "tolist"):
+            edges = [(int(u), int(v), w) for u, v, w in edges.tolist()]
+
+        g = cls()
+        g.add_vertices(vertices)
+        if len(g._vertices) != len(vertices):
+            raise ValueError("from_edge_list needs distinct vertices")
+        with _gc_paused():
+            g._add_edges_by_id((Edge(vertices[u], vertices[v], f"{vertices[u].label}-{vertices[v].label}", w), u, v)
+                               for u, v, w in edges)
+        return g
+
+    def copy(self) -> Graph:
+        """Returns a copy of the graph with the same vertex ids, sharing its Vertex and Edge objects."""
+        g = self.__class__()
+        # dict.copy reuses the stored hashes instead of calling __hash__ again.
+        g._vertices = self._vertices.copy()
+        g._vertex_list = self._vertex_list.copy()
+        g._adjacency = [None if adjacent is None else adjacent.copy() for adjacent in self._adjacency]
+        g._edges = self._edges.copy()
+        g._fingerprint = self._fingerprint
+        # The lists are replaced rather than changed, so they can be shared.
+        g._sorted = self._sorted.copy()
+        return g
+
+    def subgraph(self, vertices: Iterable[Vertex]) -> Graph:
+        """Returns the subgraph induced by vertices, sharing the Vertex and Edge objects.
+
+        The vertices are numbered from 0 in their order in this graph.
+        """
+        keep = bytearray(self.id_bound())
+        for x in vertices:
+            keep[self._vertices[x]] = 1
+        old_ids = [i for i in self._vertices.values() if keep[i]]
+        new_ids = [0] * self.id_bound()
+        for k, i in enumerate(old_ids):
+            new_ids[i] = k
+
+        g = self.__class__()
+        g._vertex_list = [self._vertex_list[i] for i in old_ids]
+        g._vertices = {x: k for k, x in enumerate(g._vertex_list)}
+        g._adjacency = [{new_ids[j]: e for j, e in self._adjacency[i].items() if keep[j]} for i in old_ids]
+        g._edges = {e: (new_ids[u], new_ids[v]) for e, (u, v) in self._edges.items() if keep[u] and keep[v]}
+        g._fingerprint = (sum(map(_vertex_hash, g._vertices)) + sum(map(_edge_hash, g._edges))) & _FINGERPRINT_MASK
+        return g
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(vertices=[{', '.join(str(v) for v in self._vertices.keys())}], edges=[{', '.join(str(e) for e in self._edges.keys())}])"
@@ -70,42 +187,209 @@ class Graph:
     def edges(self) -> list[Edge]:
         return list(self._edges.keys())
 
+    @property
+    def fingerprint(self) -> int:
+        """A hash of the vertex labels and the edges' endpoints, labels and weights.
+
+        It is the sum of one hash per vertex and per edge, updated as the graph
+        changes, so reading it costs O(1). Graphs with the same vertices and
+        edges have the same fingerprint whatever order they were built in.
+        Changing an edge's weight in place is not seen, so remove and re-add
+        the edge instead. Like hash(), it differs between processes.
+        """
+        return self._fingerprint
+
     def num_vertices(self) -> int:
         return len(self._vertices)
 
     def num_edges(self) -> int:
         return len(self._edges)
 
+    def id_bound(self) -> int:
+        """Returns a number larger than the id of every vertex in the graph."""
+        return len(self._vertex_list)
+
+    def vertex_id(self, x: Vertex) -> int:
+        """Returns the id of x in this graph."""
+        return self._vertices[x]
+
+    def vertex_ids(self) -> list[int]:
+        """Returns the ids of the vertices, in the order of vertices."""
+        return list(self._vertices.values())
+
+    def vertex(self, i: int) -> Vertex:
+        """Returns the vertex with id i."""
+        x = self._vertex_list[i]
+        if x is None:
+            raise DoesNotExistError
+        return x
+
     def add_vertex(self, x: Vertex) -> None:
-        self._vertices[x] = {}
+        i = self._vertices.get(x)
+        if i is not None:
+            for edge in list(self._adjacency[i].values()):
+                self._remove_edge_entries(edge)
+            return
+        self._vertices[x] = len(self._vertex_list)
+        self._vertex_list.append(x)
+        self._adjacency.append({})
+        self._fingerprint = (self._fingerprint + _vertex_hash(x)) & _FINGERPRINT_MASK
+
+    def add_vertices(self, vertices: Iterable[Vertex]) -> None:
+        """Adds many vertices, as add_vertex would one at a time."""
+        vertices = list(vertices)
+        new = dict.fromkeys(vertices)
+        if len(new) != len(vertices) or not self._vertices.keys().isdisjoint(new):
+            for x in vertices:
+                self.add_vertex(x)
+            return
+
+        start = len(self._vertex_list)
+        self._vertices.update(zip(vertices, range(start, start + len(vertices))))
+        self._vertex_list.extend(vertices)
+        self._adjacency.extend({} for _ in vertices)
+        self._fingerprint = (self._fingerprint + sum(map(_vertex_hash, vertices))) & _FINGERPRINT_MASK
+
+    def add_edges(self, edges: Iterable[Edge]) -> None:
+        """Adds many edges between vertices in the graph, as add_edge(e.vertex_1, e.vertex_2, e) would."""
+        ids = self._vertices
+        with _gc_paused():
+            self._add_edges_by_id((e, ids[e.vertex_1], ids[e.vertex_2]) for e in edges)
+
+    def _add_edges_by_id(self, edges: Iterable[tuple[Edge, int, int]]) -> None:
+        # Adds each edge e between the vertices with ids u and v. Only the
+        # edges themselves are hashed.
+        adjacency = self._adjacency
+        table = self._edges
+        fingerprint = 0
+        for e, u, v in edges:
+            adjacent = adjacency[u]
+            if v in adjacent:
+                # e replaces an edge, which _add_edge handles.
+                self._add_edge(u, v, e)
+                continue
+            adjacent[v] = e
+            adjacency[v][u] = e
+            table[e] = (u, v)
+            fingerprint += hash(("edge", e._hash, e.weight))
+        self._fingerprint = (self._fingerprint + fingerprint) & _FINGERPRINT_MASK
+        self._sorted.clear()
 
     def add_edge(self, x: Vertex, y: Vertex, e: Edge) -> None:
-        self._vertices[x][y] = e
-        self._vertices[y][x] = e
-        self._edges[e] = (x, y)
+        self._add_edge(self._vertices[x], self._vertices[y], e)
+
+    def _add_edge(self, u: int, v: int, e: Edge) -> None:
+        old = self._adjacency[u].get(v)
+        if old is not None:
+            # Replaced in the adjacency maps below, keeping their order.
+            del self._edges[old]
+            self._fingerprint -= _edge_hash(old)
+        self._fingerprint = (self._fingerprint + _edge_hash(e)) & _FINGERPRINT_MASK
+        self._adjacency[u][v] = e
+        self._adjacency[v][u] = e
+        self._edges[e] = (u, v)
+        self._sorted.pop(u, None)
+        self._sorted.pop(v, None)
 
     def degree(self, x: Vertex) -> int:
-        return len(self._vertices[x].keys())
+        return len(self._adjacency[self._vertices[x]])
 
     def get_edge(self, x: Vertex, y: Vertex) -> Edge:
-        e = self._vertices[x].get(y, None)
+        j = self._vertices.get(y)
+        e = None if j is None else self._adjacency[self._vertices[x]].get(j)
         if e is None:
             raise DoesNotExistError
         return e
 
     def get_edges(self, x: Vertex) -> list[Edge]:
-        return list(self._vertices[x].values())
+        return list(self._adjacency[self._vertices[x]].values())
+
+    def neighbours(self, x: Vertex) -> list[tuple[Vertex, Edge]]:
+        """Returns the (neighbour, edge) pairs of x."""
+        vertices = self._vertex_list
+        return [(vertices[j], e) for j, e in self._adjacency[self._vertices[x]].items()]
+
+    def adjacency(self, i: int) -> Iterable[tuple[int, Edge]]:
+        """Returns the (neighbour id, edge) pairs of the vertex with id i without copying them.
+
+        The result is a view of the graph's adjacency map, so the graph must
+        not be changed while it is iterated over.
+        """
+        return self._adjacency[i].items()
+
+    def sorted_adjacency(self, i: int) -> list[tuple[float, int, Edge]]:
+        """Returns the (weight, neighbour id, edge) triples of the vertex with id i in increasing weight order.
+
+        The list is sorted on first use and kept until an edge of the vertex is
+        added or removed, so it must not be modified. Like fingerprint, changes
+        to an edge's weight in place are not seen.
+        """
+        entries = self._sorted.get(i)
+        if entries is None:
+            entries = sorted(((e.weight, j, e) for j, e in self._adjacency[i].items()), key=itemgetter(0))
+            self._sorted[i] = entries
+        return entries
+
+    def clear_sorted_adjacency(self) -> None:
+        """Drops the lists kept by sorted_adjacency, so the next calls sort again."""
+        self._sorted.clear()
 
     def remove_edge(self, e: Edge) -> None:
-        if e not in self._edges:
+        ends = self._edges.get(e)
+        if ends is None:
             raise DoesNotExistError
-        del self._edges[e]
-        del self._vertices[e.vertex_1][e.vertex_2]
-        del self._vertices[e.vertex_2][e.vertex_1]
+        u, v = ends
+        self._remove_edge_entries(self._adjacency[u][v])
 
     def remove_vertex(self, x: Vertex) -> None:
-        if x not in self._vertices:
+        i = self._vertices.get(x)
+        if i is None:
             raise DoesNotExistError
-        for edge in self._vertices[x].values():
-            del self._edges[edge]
+        for edge in list(self._adjacency[i].values()):
+            self._remove_edge_entries(edge)
         del self._vertices[x]
+        self._vertex_list[i] = None
+        self._adjacency[i] = None
+        self._sorted.pop(i, None)
+        self._fingerprint = (self._fingerprint - _vertex_hash(x)) & _FINGERPRINT_MASK
+
+    def _remove_edge_entries(self, e: Edge) -> None:
+        # e must be the edge stored in the adjacency maps.
+        u, v = self._edges.pop(e)
+        del self._adjacency[u][v]
+        if u != v:
+            del self._adjacency[v][u]
+        self._sorted.pop(u, None)
+        self._sorted.pop(v, None)
+        self._fingerprint = (self._fingerprint - _edge_hash(e)) & _FINGERPRINT_MASK
+
+
+_FINGERPRINT_MASK = (1 << 64) - 1
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Bulk construction makes many objects that live as long as the graph, so
+    # collections triggered while making them would find nothing to free.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _edge_key_hash(vertex_1: Vertex, vertex_2: Vertex, label: str) -> int:
+    # Symmetric in the endpoints, as Edge.__eq__ is. The cached vertex hashes
+    # are added directly to avoid calling Vertex.__hash__.
+    return hash((label, vertex_1._hash + vertex_2._hash))
+
+
+def _vertex_hash(x: Vertex) -> int:
+    return hash(("vertex", x._hash))
+
+
+def _edge_hash(e: Edge) -> int:
+    # Unlike Edge.__hash__, the weight counts.
+    return hash(("edge", e._hash, e.weight))
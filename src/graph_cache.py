@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    from .csr import CSRGraph
+    from .generators import GENERATOR_VERSION
+    from .graph_file import GraphFileError, read_csr, write_csr
+except ImportError:
+    from csr import CSRGraph
+    from generators import GENERATOR_VERSION
+    from graph_file import GraphFileError, read_csr, write_csr
+
+
+class GraphCache:
+    """An on-disk cache of generated graphs keyed by (n, m, seed, generator version).
+
+    Graphs are stored in the binary graph file format and loaded memory-mapped.
+    When the files exceed max_bytes the least recently used are deleted. A
+    file's modification time records its last use.
+    """
+
+    SUFFIX = ".csr"
+
+    def __init__(self, directory: str | os.PathLike, max_bytes: int = 1 << 30) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self.directory}, hits={self.hits}, misses={self.misses})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    def path(self, n: int, m: int, seed: int) -> Path:
+        return self.directory / f"n{n}-m{m}-s{seed}-g{GENERATOR_VERSION}{self.SUFFIX}"
+
+    def get(self, n: int, m: int, seed: int) -> Optional[CSRGraph]:
+        """Returns the cached graph, or None if it is not in the cache."""
+        path = self.path(n, m, seed)
+        try:
+            g = read_csr(path)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except GraphFileError:
+            logging.warning(f"Ignoring unreadable cached graph {path}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return g
+
+    def put(self, n: int, m: int, seed: int, g: CSRGraph) -> None:
+        path = self.path(n, m, seed)
+        # Write then rename, so a concurrent reader never sees a partial file.
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        write_csr(g, tmp)
+        os.replace(tmp, path)
+        self._evict(keep=path)
+
+    def get_or_create(self, n: int, m: int, seed: int,
+                      create: Callable[[int, int, int], CSRGraph]) -> CSRGraph:
+        """Returns the cached graph, calling create(n, m, seed) and caching the result on a miss."""
+        g = self.get(n, m, seed)
+        if g is None:
+            g = create(n, m, seed)
+            self.put(n, m, seed, g)
+        return g
+
+    def size(self) -> int:
+        """Returns the total size of the cached files in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self) -> None:
+        for _, _, path in self._entries():
+            _remove(path)
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self, keep: Path) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                _remove(path)
+                total -= size
+
+
+def _remove(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError:
+        # Windows refuses to delete a file that is still memory-mapped.
+        logging.debug(f"Could not evict {path}")
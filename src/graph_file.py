@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+try:
+    from .csr import CSRGraph, OFFSET_TYPECODE, VERTEX_TYPECODE, WEIGHT_TYPECODE
+    from .graph import Graph
+except ImportError:
+    from csr import CSRGraph, OFFSET_TYPECODE, VERTEX_TYPECODE, WEIGHT_TYPECODE
+    from graph import Graph
+
+# A graph file is a 32 byte header followed by the CSR arrays, each padded to
+# 8 bytes so that every array can be viewed in place. All values are little-endian.
+#
+#   magic    8s   b"CSRGRAPH"
+#   version  I
+#   flags    I    FLAG_LABELS if the file has a label section
+#   n        q    number of vertices
+#   nnz      q    number of neighbour entries (twice the number of edges)
+#
+#   offsets  q * (n + 1)
+#   targets  i * nnz
+#   weights  d * nnz
+#
+# Since version 2 the arrays may be followed by the vertex labels as UTF-8:
+#
+#   label offsets  q * (n + 1)   byte offsets into the label data
+#   label data     bytes
+MAGIC = b"CSRGRAPH"
+VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+HEADER = struct.Struct("<8sIIqq")
+FLAG_LABELS = 1
+
+
+class GraphFileError(Exception):
+    pass
+
+
+class _Labels(Sequence):
+    """Vertex labels read from a graph file. Each label is decoded when it is accessed."""
+
+    def __init__(self, offsets: Sequence[int], data: memoryview) -> None:
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("label index out of range")
+        return bytes(self._data[self._offsets[i]:self._offsets[i + 1]]).decode()
+
+
+def _padded(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _write_array(f, typecode: str, values: Sequence) -> None:
+    a = values if isinstance(values, array) and values.typecode == typecode else array(typecode, values)
+    if sys.byteorder != "little":
+        a = array(typecode, a)
+        a.byteswap()
+    data = a.tobytes()
+    f.write(data)
+    f.write(bytes(_padded(len(data)) - len(data)))
+
+
+def write_csr(g: CSRGraph, path: str | os.PathLike) -> None:
+    """Writes g, with its labels if it has any, to path in the binary graph format."""
+    n, nnz = g.num_vertices(), len(g.targets)
+    flags = 0 if g.labels is None else FLAG_LABELS
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, n, nnz))
+        _write_array(f, OFFSET_TYPECODE, g.offsets)
+        _write_array(f, VERTEX_TYPECODE, g.targets)
+        _write_array(f, WEIGHT_TYPECODE, g.weights)
+
+        if flags & FLAG_LABELS:
+            encoded = [label.encode() for label in g.labels]
+            offsets = array(OFFSET_TYPECODE, [0])
+            for label in encoded:
+                offsets.append(offsets[-1] + len(label))
+            _write_array(f, OFFSET_TYPECODE, offsets)
+            data = b"".join(encoded)
+            f.write(data)
+            f.write(bytes(_padded(len(data)) - len(data)))
+
+
+def read_csr(path: str | os.PathLike) -> CSRGraph:
+    """Opens a graph file as a CSRGraph whose arrays are views of a memory map.
+
+    Nothing is copied, so pages are only read from disk as the graph is used,
+    and CSRGraph.to_numpy gives NumPy views of the same memory. The map stays
+    open for as long as the graph or any view of it is alive. On big-endian
+    machines the arrays are copied and byte swapped instead.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER.size:
+            raise GraphFileError(f"{path} is too short to be a graph file")
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, flags, n, nnz = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise GraphFileError(f"{path} is not a graph file")
+    if version not in SUPPORTED_VERSIONS:
+        raise GraphFileError(f"{path} has unsupported version {version}")
+
+    view = memoryview(buffer)
+    position = HEADER.size
+
+    def section(typecode: str, length: int) -> Sequence:
+        nonlocal position
+        nbytes = array(typecode).itemsize * length
+        if position + nbytes > size:
+            raise GraphFileError(f"{path} is truncated")
+        data = view[position:position + nbytes]
+        position += _padded(nbytes)
+        if sys.byteorder != "little":
+            a = array(typecode, data.tobytes())
+            a.byteswap()
+            return a
+        return data.cast(typecode)
+
+    offsets = section(OFFSET_TYPECODE, n + 1)
+    targets = section(VERTEX_TYPECODE, nnz)
+    weights = section(WEIGHT_TYPECODE, nnz)
+
+    labels = None
+    if flags & FLAG_LABELS:
+        label_offsets = section(OFFSET_TYPECODE, n + 1)
+        labels = _Labels(label_offsets, section("B", label_offsets[-1]))
+
+    return CSRGraph(offsets, targets, weights, labels)
+
+
+def save_graph(g: Graph, path: str | os.PathLike) -> None:
+    """Writes a graph.Graph to path, keeping its vertex labels."""
+    write_csr(CSRGraph.from_graph(g), path)
+
+
+def load_graph(path: str | os.PathLike) -> Graph:
+    """Reads a graph file back into a graph.Graph.
+
+    The file holds no edge labels, so edges are labelled as by CSRGraph.to_graph.
+    """
+    return read_csr(path).to_graph()
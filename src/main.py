@@ -1,212 +1,987 @@
 from __future__ import annotations  # for compatibility with older Python versions
 
+import argparse
+import csv
+import heapq
+import itertools
 import logging
+import multiprocessing
+import os
 import random
 import math
-import timeit
-import sys
 import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from functools import partial
+from typing import Callable, Iterator, Optional, Union
 
 from graph import Graph, Edge, Vertex
-from priority_queue import APQ, HeapAPQ, UnsortedListAPQ, Element
+from csr import CSRGraph
+from priority_queue import APQ, HeapAPQ, UnsortedListAPQ, DaryHeapAPQ, PairingHeapAPQ, IndexedHeapAPQ, Element, \
+    OpCounts, BucketAPQ, RadixHeapAPQ
 from dict_zip import dict_zip
+from generators import random_edges
+from graph_cache import GraphCache
+from timing import TimingStats, measure
+from mst import boruvka, euclidean_mst, kruskal
 
 import matplotlib.pyplot as plt
+import numpy as np
 
 PATH = "../figures/"
 
+# Edge weights of the generated graphs are drawn from 1..MAX_WEIGHT.
+MAX_WEIGHT = 20
 
-def create_graph(n: int, m: int) -> Graph:
-    if m > ((n * (n - 1)) // 2):
-        raise ValueError(
-            f"Cannot create {m} edges for a graph with {n} nodes.")
-    g = Graph()
 
-    vertices = [Vertex("0")]
-    g.add_vertex(vertices[0])
+def create_graph(n: int, m: int, rng: Optional[random.Random] = None) -> Graph:
+    if rng is None:
+        rng = random.Random(random.getrandbits(64))
 
-    # A set of tuples of all the edges made
-    edges: set[tuple[str, str]] = set()
+    # The first n - 1 pairs form a spanning tree, so the graph is connected
+    return Graph.from_edge_list(n, [(i, j, rng.randint(1, MAX_WEIGHT)) for i, j in random_edges(n, m, rng)])
 
-    for i in range(1, n):
-        v = Vertex(str(i))
 
-        v2 = random.choice(vertices)
+def prim(g: Union[Graph, CSRGraph], apq: APQ, root: Union[Vertex, int, None] = None) -> list[Edge]:
+    """Prim's algorithm.
 
-        w = random.randint(1, 20)
+    Without a root, every vertex is queued at infinity up front. On a
+    disconnected graph the trees of all components then come back as one
+    list, see minimum_spanning_forest to keep them apart. With a root, only
+    the root's component is searched and vertices are queued as they are
+    reached, so the work depends on the size of that component alone.
 
-        e = Edge(v, v2, w, w)
+    Args:
+        g (Graph | CSRGraph): The graph.
+        apq (APQ): An empty queue to use.
+        root (Vertex | int, optional): The vertex to grow the tree from.
 
-        edges.add((v.label, v2.label))
-        vertices.append(v)
+    Returns:
+        list[Edge]: The tree edges, or (u, v, weight) triples for a CSRGraph.
+    """
+    if isinstance(g, CSRGraph):
+        return prim_csr(g, apq, root)
+    if root is not None:
+        return _grow_tree(g, apq, g.vertex_id(root), bytearray(g.id_bound()))
 
-        g.add_vertex(v)
-        g.add_edge(v, v2, e)
+    # Vertices are keyed by their integer ids in g, which hash and compare much
+    # faster than going through Vertex.__hash__ and Vertex.__eq__.
+    locs: dict[int, Element] = {}
+    for i in g.vertex_ids():
+        locs[i] = apq.add(math.inf, (i, None))
 
-    for _ in range(m - n + 1):
-        # Vertex 0 and Vertex 1 are always connected
-        v1, v2 = vertices[0], vertices[1]
-        # so the while loop will always run at least once
+    tree = []
+    while apq.length():
+        c: tuple[int, Edge] = apq.remove_min()
+        v, e = c
+        del locs[v]
+        if e is not None:
+            tree.append(e)
 
-        while (v1.label, v2.label) in edges or (v2.label, v1.label) in edges:
-            # Get two vertices that have not been connected already
-            v1, v2 = random.sample(vertices, 2)
+        for w, d in g.adjacency(v):
+            el = locs.get(w)
+            if el is not None:
+                cost = d.weight
+                if cost < apq.get_key(el):
+                    el.value = (w, d)
+                    apq.update_key(el, cost)
+    return tree
+
+
+def _grow_tree(g: Graph, apq: APQ, root: int, done: bytearray) -> list[Edge]:
+    # Prim's algorithm from the vertex with id root, queueing vertices when they
+    # are first reached. done is indexed by id and marks the vertices taken into
+    # a tree.
+    locs: dict[int, Element] = {root: apq.add(0, (root, None))}
+
+    tree = []
+    while apq.length():
+        v, e = apq.remove_min()
+        del locs[v]
+        done[v] = 1
+        if e is not None:
+            tree.append(e)
 
-        w = random.randint(1, 20)
+        for w, d in g.adjacency(v):
+            if done[w]:
+                continue
+            el = locs.get(w)
+            if el is None:
+                locs[w] = apq.add(d.weight, (w, d))
+            elif d.weight < apq.get_key(el):
+                el.value = (w, d)
+                apq.update_key(el, d.weight)
+    return tree
 
-        e = Edge(v1, v2, w, w)
 
-        edges.add((v1.label, v2.label))
-        g.add_edge(v1, v2, e)
+def prim_csr(g: CSRGraph, apq: APQ, root: Optional[int] = None) -> list[tuple[int, int, float]]:
+    """Prim's algorithm over a CSRGraph.
 
-    return g
+    Args:
+        g (CSRGraph): The graph.
+        apq (APQ): An empty queue to use.
+        root (int, optional): The vertex to grow the tree from, see prim.
 
+    Returns:
+        list[tuple[int, int, float]]: The tree as (u, v, weight) triples.
+    """
+    if root is not None:
+        return _grow_csr_tree(g, apq, root, bytearray(g.num_vertices()))
 
-def prim(g: Graph, apq: APQ) -> list[Edge]:
-    locs: dict[Vertex, Element] = {}
-    for v in g.vertices:
-        el = apq.add(math.inf, (v, None))
-        locs[v] = el
+    locs: list[Element] = [apq.add(math.inf, (v, None)) for v in g.vertices]
+    done = [False] * g.num_vertices()
+    offsets, targets, weights = g.offsets, g.targets, g.weights
 
     tree = []
     while apq.length():
-        c: tuple[Vertex, Edge] = apq.remove_min()
-        v, e = c
-        del locs[v]
+        v, e = apq.remove_min()
+        done[v] = True
         if e is not None:
             tree.append(e)
 
-        for d in g.get_edges(v):
-            w = d.opposite(v)
-            if w in locs:
-                cost = d.weight
+        for i in range(offsets[v], offsets[v + 1]):
+            w = targets[i]
+            if not done[w]:
+                cost = weights[i]
                 if cost < apq.get_key(locs[w]):
-                    locs[w].value = (w, d)
+                    locs[w].value = (w, (v, w, cost))
                     apq.update_key(locs[w], cost)
     return tree
 
 
-def prim_heap(g: Graph) -> list[Edge]:
+def _grow_csr_tree(g: CSRGraph, apq: APQ, root: int, done: bytearray) -> list[tuple[int, int, float]]:
+    locs: dict[int, Element] = {root: apq.add(0, (root, None))}
+    offsets, targets, weights = g.offsets, g.targets, g.weights
+
+    tree = []
+    while apq.length():
+        v, e = apq.remove_min()
+        del locs[v]
+        done[v] = 1
+        if e is not None:
+            tree.append(e)
+
+        for i in range(offsets[v], offsets[v + 1]):
+            w = targets[i]
+            if done[w]:
+                continue
+            cost = weights[i]
+            el = locs.get(w)
+            if el is None:
+                locs[w] = apq.add(cost, (w, (v, w, cost)))
+            elif cost < apq.get_key(el):
+                el.value = (w, (v, w, cost))
+                apq.update_key(el, cost)
+    return tree
+
+
+@dataclass(frozen=True)
+class SpanningTree:
+    """The minimum spanning tree of one connected component."""
+    root: Union[Vertex, int]
+    edges: list
+    weight: float
+
+
+def minimum_spanning_forest(g: Union[Graph, CSRGraph], apq: Optional[APQ] = None) -> list[SpanningTree]:
+    """Finds a minimum spanning tree of every connected component of g.
+
+    Prim's algorithm is restarted from each vertex not yet in a tree, in the
+    order of g.vertices, with vertices queued lazily as in prim with a root.
+
+    Args:
+        g (Graph | CSRGraph): The graph.
+        apq (APQ, optional): An empty queue to use. Defaults to a HeapAPQ.
+
+    Returns:
+        list[SpanningTree]: One tree per component. Isolated vertices have
+            trees with no edges.
+    """
+    if apq is None:
+        apq = HeapAPQ()
+
+    forest = []
+    if isinstance(g, CSRGraph):
+        done = bytearray(g.num_vertices())
+        for root in g.vertices:
+            if not done[root]:
+                tree = _grow_csr_tree(g, apq, root, done)
+                forest.append(SpanningTree(root, tree, sum(w for _, _, w in tree)))
+    else:
+        done = bytearray(g.id_bound())
+        for root, i in zip(g.vertices, g.vertex_ids()):
+            if not done[i]:
+                tree = _grow_tree(g, apq, i, done)
+                forest.append(SpanningTree(root, tree, sum(e.weight for e in tree)))
+    return forest
+
+
+def prim_indexed(g: CSRGraph) -> list[tuple[int, int, float]]:
+    """Prim's algorithm over a CSRGraph using an IndexedHeapAPQ.
+
+    The queue is filled with one heapify instead of V adds, and vertices are
+    addressed by id, so the loop allocates no Elements or locator dict.
+
+    Returns:
+        list[tuple[int, int, float]]: The tree as (u, v, weight) triples.
+    """
+    n = g.num_vertices()
+    apq = IndexedHeapAPQ(n)
+    apq.heapify([math.inf] * n)
+    parent = [-1] * n
+    done = bytearray(n)
+    offsets, targets, weights = g.offsets, g.targets, g.weights
+
+    tree = []
+    while apq.length():
+        v = apq.remove_min()
+        done[v] = 1
+        if parent[v] >= 0:
+            tree.append((parent[v], v, apq.get_key(v)))
+
+        for i in range(offsets[v], offsets[v + 1]):
+            w = targets[i]
+            if not done[w]:
+                cost = weights[i]
+                if cost < apq.get_key(w):
+                    parent[w] = v
+                    apq.update_key(w, cost)
+    return tree
+
+
+def adjacency_matrix(g: Graph) -> tuple[np.ndarray, np.ndarray]:
+    """Builds the dense form of g used by prim_dense.
+
+    Vertex ids follow the order of ``g.vertices``.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The weight matrix, with ``inf`` where there is
+            no edge, and an object matrix holding the Edge between each pair.
+    """
+    n = g.num_vertices()
+    index = {v: i for i, v in enumerate(g.vertices)}
+    weights = np.full((n, n), np.inf)
+    edges = np.empty((n, n), dtype=object)
+    for e in g.edges:
+        i, j = index[e.vertex_1], index[e.vertex_2]
+        weights[i, j] = weights[j, i] = e.weight
+        edges[i, j] = edges[j, i] = e
+    return weights, edges
+
+
+def prim_dense(weights: np.ndarray, edges: np.ndarray) -> list[Edge]:
+    """O(V^2) Prim's algorithm over an adjacency matrix.
+
+    Each step is one argmin over the key vector and one vectorised relaxation
+    of the chosen vertex's row, so there are no per-edge Python operations.
+
+    Args:
+        weights (np.ndarray): The weight matrix, with ``inf`` where there is no edge.
+        edges (np.ndarray): The Edge for each pair of vertices, as from adjacency_matrix.
+
+    Returns:
+        list[Edge]: The tree edges in the order their vertices were reached.
+    """
+    n = len(weights)
+    key = np.full(n, np.inf)
+    parent = np.full(n, -1)
+    done = np.zeros(n, dtype=bool)
+
+    tree = []
+    for _ in range(n):
+        v = int(np.argmin(key))
+        if key[v] == np.inf:
+            # Every vertex left is unreachable so far, take the first of them.
+            v = int(np.argmin(done))
+        elif parent[v] >= 0:
+            tree.append(edges[parent[v], v])
+        done[v] = True
+        key[v] = np.inf
+
+        row = weights[v]
+        better = (row < key) & ~done
+        parent[better] = v
+        key[better] = row[better]
+    return tree
+
+
+def prim_lazy_heap(g: Graph) -> list[Edge]:
+    """Prim's algorithm with lazy deletion on heapq.
+
+    Instead of decreasing keys, every candidate edge is pushed as a
+    (weight, counter, vertex id, edge) tuple and entries for vertices already
+    in the tree are skipped when popped. The counter breaks ties so Edge
+    objects are never compared. The search stops once every vertex is
+    in the tree, leaving any remaining entries unpopped.
+    """
+    done = bytearray(g.id_bound())
+    remaining = g.num_vertices()
+    counter = itertools.count()
+
+    tree = []
+    for root in g.vertex_ids():
+        if done[root]:
+            continue
+        heap = [(0, next(counter), root, None)]
+        while heap and remaining:
+            _, _, v, e = heapq.heappop(heap)
+            if done[v]:
+                continue
+            done[v] = 1
+            remaining -= 1
+            if e is not None:
+                tree.append(e)
+
+            for w, d in g.adjacency(v):
+                if not done[w]:
+                    heapq.heappush(heap, (d.weight, next(counter), w, d))
+    return tree
+
+
+def prim_sorted_heap(g: Graph) -> list[Edge]:
+    """Lazy Prim's algorithm over Graph.sorted_adjacency.
+
+    The heap holds at most one entry per tree vertex: its cheapest edge that
+    has not yet been found to lead back into the tree, as a (weight, vertex
+    id, position, neighbours) tuple. Popping an entry either adds a vertex to
+    the tree or finds that the edge is stale, and in both cases the vertex's
+    entry moves on to its next edge. So the heap stays O(V) in size and each
+    edge is looked at most once from each end, and not at all once every
+    vertex is in the tree. Sorting the neighbours costs O(E log V) the first
+    time, after which the graph keeps the order until it changes.
+    """
+    done = bytearray(g.id_bound())
+    remaining = g.num_vertices()
+
+    tree = []
+    for root in g.vertex_ids():
+        if done[root]:
+            continue
+        done[root] = 1
+        remaining -= 1
+        adjacent = g.sorted_adjacency(root)
+        heap = [(adjacent[0][0], root, 0, adjacent)] if adjacent else []
+        while heap and remaining:
+            _, v, i, adjacent = heap[0]
+            _, w, e = adjacent[i]
+            # Move this vertex's entry on to its next edge.
+            if i + 1 < len(adjacent):
+                heapq.heapreplace(heap, (adjacent[i + 1][0], v, i + 1, adjacent))
+            else:
+                heapq.heappop(heap)
+
+            if not done[w]:
+                done[w] = 1
+                remaining -= 1
+                tree.append(e)
+                entries = g.sorted_adjacency(w)
+                j = 0
+                while j < len(entries) and done[entries[j][1]]:
+                    j += 1
+                if j < len(entries):
+                    heapq.heappush(heap, (entries[j][0], w, j, entries))
+    return tree
+
+
+def prim_heap(g: Union[Graph, CSRGraph]) -> list[Edge]:
     apq = HeapAPQ()
     return prim(g, apq)
 
 
-def prim_unsorted_list(g: Graph) -> list[Edge]:
+def prim_unsorted_list(g: Union[Graph, CSRGraph]) -> list[Edge]:
     apq = UnsortedListAPQ()
     return prim(g, apq)
 
 
-def time_functions(ratios: list[float], ns: list[int], iterations: int = 100):
+def prim_dary_heap(g: Union[Graph, CSRGraph], d: int = 4) -> list[Edge]:
+    apq = DaryHeapAPQ(d)
+    return prim(g, apq)
 
-    times_heap: dict[int, dict[float, float]] = {}
-    times_unsorted_list: dict[int, dict[float, float]] = {}
 
-    for n in ns:
-        times_heap[n] = {}
-        times_unsorted_list[n] = {}
-        for ratio in ratios:
-            logging.info(f"Running {n = } for {ratio = }")
-            max_edges = (n * (n - 1)) // 2
+def prim_pairing_heap(g: Union[Graph, CSRGraph]) -> list[Edge]:
+    apq = PairingHeapAPQ()
+    return prim(g, apq)
 
-            m = int(ratio * max_edges)
 
-            g = create_graph(n, m)
+def prim_bucket(g: Union[Graph, CSRGraph], max_key: int = MAX_WEIGHT) -> list[Edge]:
+    apq = BucketAPQ(max_key)
+    return prim(g, apq)
 
-            glb = {"prim_heap": prim_heap,
-                   "prim_unsorted_list": prim_unsorted_list, "g": g}
 
-            t1 = timeit.timeit("prim_heap(g)", globals=glb, number=iterations)
-            t2 = timeit.timeit("prim_unsorted_list(g)",
-                               globals=glb, number=iterations)
+def prim_radix_heap(g: Union[Graph, CSRGraph]) -> list[Edge]:
+    apq = RadixHeapAPQ()
+    return prim(g, apq)
 
-            times_heap[n][ratio] = t1
-            times_unsorted_list[n][ratio] = t2
 
-    return times_heap, times_unsorted_list
+def _as_is(g: Graph) -> tuple:
+    return (g,)
 
 
-def get_data(ratios, ns, iterations, skip_tests):
-    if not skip_tests:
-        times_heap, times_unsorted_list = time_functions(
-            ratios, ns, iterations=iterations)
+def _to_csr(g: Graph) -> tuple:
+    return (CSRGraph.from_graph(g),)
 
-        with open("data.json", "w") as f:
-            json.dump([times_heap, times_unsorted_list], f)
 
+def _to_adjacency_matrix(g: Graph) -> tuple:
+    return adjacency_matrix(g)
+
+
+@dataclass(frozen=True)
+class Algorithm:
+    label: str
+    run: Callable[..., list]
+    # Converts the generated Graph into the arguments of run. Not timed.
+    prepare: Callable[[Graph], tuple] = _as_is
+    # Makes the APQ that run passes to prim, if any, so its operations can be
+    # counted. An APQ class, or a functools.partial of one with run's arguments.
+    apq: Optional[Callable[[], APQ]] = None
+    # Whether run only accepts non-negative integer weights up to some bound.
+    integer_weights: bool = False
+    # Drops anything run caches on its arguments. Benchmarks call it before
+    # each timed run, so the warm-up run can't spare the timed runs the work.
+    reset: Optional[Callable[..., None]] = None
+
+
+ALGORITHMS: dict[str, Algorithm] = {
+    "prim_heap": Algorithm("Heap APQ", prim_heap, apq=HeapAPQ),
+    "prim_unsorted_list": Algorithm("Unsorted List APQ", prim_unsorted_list, apq=UnsortedListAPQ),
+    "prim_heap_csr": Algorithm("Heap APQ (CSR)", prim_heap, _to_csr, apq=HeapAPQ),
+    "prim_indexed_csr": Algorithm("Indexed Heap APQ (CSR)", prim_indexed, _to_csr),
+    "prim_dense": Algorithm("Dense NumPy", prim_dense, _to_adjacency_matrix),
+    "prim_lazy_heap": Algorithm("Lazy Heap (heapq)", prim_lazy_heap),
+    "prim_sorted_heap": Algorithm("Sorted Adjacency Heap (heapq)", prim_sorted_heap,
+                                  reset=Graph.clear_sorted_adjacency),
+    "prim_dary_heap": Algorithm("4-ary Heap APQ", prim_dary_heap, apq=partial(DaryHeapAPQ, 4)),
+    "prim_pairing_heap": Algorithm("Pairing Heap APQ", prim_pairing_heap, apq=PairingHeapAPQ),
+    "prim_bucket": Algorithm("Bucket APQ", prim_bucket, apq=partial(BucketAPQ, MAX_WEIGHT), integer_weights=True),
+    "prim_radix_heap": Algorithm("Radix Heap APQ", prim_radix_heap, apq=RadixHeapAPQ, integer_weights=True),
+    "kruskal": Algorithm("Kruskal", kruskal),
+    "boruvka": Algorithm("Borůvka", boruvka),
+}
+
+
+# The seed used with a graph cache when none is given, so that separate runs
+# generate, and so find, the same graphs.
+CACHE_SEED = 0
+
+
+def _instrumented_apq(factory: Callable[[], APQ]) -> APQ:
+    # Makes the APQ that factory would, from the counting subclass of its class.
+    if isinstance(factory, partial):
+        return factory.func.instrumented()(*factory.args, **factory.keywords)
+    return factory.instrumented()()
+
+
+def _cell_rng(seed: int, n: int, ratio: float) -> random.Random:
+    # Seeding with a string hashes it with SHA-512, so every process derives the same stream.
+    return random.Random(f"{seed}:{n}:{ratio}")
+
+
+def _time_cell(n: int, ratio: float, iterations: int, algorithms: list[str],
+               seed: int, cache: Optional[GraphCache] = None, repeat: int = 5,
+               disable_gc: bool = True, count_ops: bool = False) -> tuple[dict[str, TimingStats], dict[str, OpCounts]]:
+    logging.info(f"Running {n = } for {ratio = }")
+    max_edges = (n * (n - 1)) // 2
+
+    m = int(ratio * max_edges)
+
+    if cache is None:
+        g = create_graph(n, m, _cell_rng(seed, n, ratio))
+    else:
+        g = cache.get_or_create(
+            n, m, seed, lambda n, m, seed: CSRGraph.from_graph(create_graph(n, m, _cell_rng(seed, n, ratio)))
+        ).to_graph()
+
+    times, counts = {}, {}
+    for name in algorithms:
+        algorithm = ALGORITHMS[name]
+        args = algorithm.prepare(g)
+        if algorithm.reset is None:
+            run = partial(algorithm.run, *args)
+        else:
+            def run(algorithm=algorithm, args=args):
+                algorithm.reset(*args)
+                return algorithm.run(*args)
+        times[name] = measure(run, number=iterations, repeat=repeat, disable_gc=disable_gc)
+        if count_ops and algorithm.apq is not None:
+            # A separate untimed run, so counting never affects the timings
+            apq = _instrumented_apq(algorithm.apq)
+            prim(*args, apq)
+            counts[name] = apq.counts
+    return times, counts
+
+
+def _pin_worker(cpus: multiprocessing.Queue) -> None:
+    os.sched_setaffinity(0, {cpus.get()})
+
+
+def _worker_pool(workers: int, pin_cpus: bool) -> ProcessPoolExecutor:
+    if not pin_cpus:
+        return ProcessPoolExecutor(max_workers=workers)
+    if not hasattr(os, "sched_setaffinity"):
+        logging.warning("CPU pinning is not supported on this platform")
+        return ProcessPoolExecutor(max_workers=workers)
+
+    # Each worker takes one CPU from the queue as it starts.
+    available = sorted(os.sched_getaffinity(0))
+    cpus = multiprocessing.Queue()
+    for i in range(workers):
+        cpus.put(available[i % len(available)])
+    return ProcessPoolExecutor(max_workers=workers, initializer=_pin_worker, initargs=(cpus,))
+
+
+def time_functions(ratios: list[float], ns: list[int], iterations: int = 100,
+                   algorithms: Optional[list[str]] = None, workers: int = 1,
+                   pin_cpus: bool = False, seed: Optional[int] = None,
+                   cache: Optional[GraphCache] = None, repeat: int = 5, disable_gc: bool = True,
+                   count_ops: bool = False) -> tuple[dict[str, dict[int, dict[float, TimingStats]]],
+                                                     dict[str, dict[int, dict[float, OpCounts]]]]:
+    """Times every algorithm on a random graph for each (n, ratio) cell.
+
+    Each cell records the spread of repeat samples of iterations calls, see
+    timing.measure. With count_ops, each APQ-based algorithm also runs once
+    with an instrumented APQ and its operation counts are returned alongside.
+
+    With workers > 1 the cells run in a process pool, and pin_cpus binds each
+    worker to its own CPU. Each cell's graph comes from an RNG seeded by
+    (seed, n, ratio), so results are reproducible whatever the worker count.
+    Given a cache, graphs are loaded from it and only generated on a miss,
+    and the seed defaults to CACHE_SEED instead of a random one.
+    """
+    if algorithms is None:
+        algorithms = list(ALGORITHMS)
+    if seed is None:
+        seed = random.randrange(2 ** 32) if cache is None else CACHE_SEED
+    logging.info(f"Generating graphs with {seed = }")
+
+    cells = [(n, ratio) for n in ns for ratio in ratios]
+    if workers > 1:
+        with _worker_pool(workers, pin_cpus) as pool:
+            futures = [pool.submit(_time_cell, n, ratio, iterations, algorithms, seed, cache,
+                                   repeat, disable_gc, count_ops)
+                       for n, ratio in cells]
+            results = [f.result() for f in futures]
     else:
+        results = [_time_cell(n, ratio, iterations, algorithms, seed, cache, repeat, disable_gc, count_ops)
+                   for n, ratio in cells]
+
+    times: dict[str, dict[int, dict[float, TimingStats]]] = {
+        name: {n: {} for n in ns} for name in algorithms}
+    counts: dict[str, dict[int, dict[float, OpCounts]]] = {}
+    for (n, ratio), (cell_times, cell_counts) in zip(cells, results):
+        for name, t in cell_times.items():
+            times[name][n][ratio] = t
+        for name, c in cell_counts.items():
+            counts.setdefault(name, {}).setdefault(n, {})[ratio] = c
+
+    return times, counts
+
+
+OUTPUT_FORMATS = (".json", ".csv", ".npz")
+OPCOUNT_COLUMNS = [f.name for f in fields(OpCounts)]
+RESULT_COLUMNS = ["algorithm", "n", "ratio", *(f.name for f in fields(TimingStats)), *OPCOUNT_COLUMNS]
+
+# Version 1 files are the bare timing tables, either [times_heap, times_unsorted_list]
+# or {algorithm: times}, holding one total time per cell.
+DATA_VERSION = 2
+
+
+def _to_json(table: dict) -> dict:
+    return {name: {n: {r: v.to_dict() for r, v in d.items()} for n, d in t.items()}
+            for name, t in table.items()}
+
+
+def _from_json(table: dict, load: Callable) -> dict:
+    return {name: {int(k1): {float(k2): load(v) for k2, v in d.items()} for k1, d in t.items()}
+            for name, t in table.items()}
+
+
+def dump_times(times: dict[str, dict[int, dict[float, TimingStats]]],
+               counts: dict[str, dict[int, dict[float, OpCounts]]], f) -> None:
+    json.dump({"version": DATA_VERSION, "times": _to_json(times), "counts": _to_json(counts)}, f)
+
+
+def load_times(f) -> tuple[dict[str, dict[int, dict[float, TimingStats]]],
+                           dict[str, dict[int, dict[float, OpCounts]]]]:
+    data = json.load(f)
+    if isinstance(data, list):
+        # Files written before the algorithm registry hold [times_heap, times_unsorted_list]
+        data = dict(zip(("prim_heap", "prim_unsorted_list"), data))
+    if data.get("version") == DATA_VERSION:
+        return (_from_json(data["times"], TimingStats.from_dict),
+                _from_json(data.get("counts", {}), lambda d: OpCounts(**d)))
+    # A version 1 total is kept as recorded, as a single sample.
+    return _from_json(data, lambda v: TimingStats.from_samples([v])), {}
+
+
+def _rows(times: dict[str, dict[int, dict[float, TimingStats]]],
+          counts: dict[str, dict[int, dict[float, OpCounts]]]) -> Iterator[dict]:
+    # One flat row per (algorithm, n, ratio) cell. Cells without counts get None.
+    empty = dict.fromkeys(OPCOUNT_COLUMNS)
+    for name, t in times.items():
+        for n, d in t.items():
+            for ratio, stats in d.items():
+                c = counts.get(name, {}).get(n, {}).get(ratio)
+                yield {"algorithm": name, "n": n, "ratio": ratio, **stats.to_dict(),
+                       **(empty if c is None else c.to_dict())}
+
+
+def write_csv(times: dict[str, dict[int, dict[float, TimingStats]]],
+              counts: dict[str, dict[int, dict[float, OpCounts]]], f) -> None:
+    writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+    writer.writeheader()
+    writer.writerows(_rows(times, counts))
+
+
+def write_npz(times: dict[str, dict[int, dict[float, TimingStats]]],
+              counts: dict[str, dict[int, dict[float, OpCounts]]], path: str) -> None:
+    """Writes one NumPy array per column. Missing counts are -1."""
+    rows = list(_rows(times, counts))
+    columns = {name: [row[name] for row in rows] for name in RESULT_COLUMNS}
+    arrays = {"algorithm": np.array(columns.pop("algorithm"), dtype=str)}
+    for name, values in columns.items():
+        if name in OPCOUNT_COLUMNS:
+            arrays[name] = np.array([-1 if v is None else v for v in values], dtype=np.int64)
+        else:
+            arrays[name] = np.array(values)
+    np.savez(path, **arrays)
+
+
+def write_results(times: dict[str, dict[int, dict[float, TimingStats]]],
+                  counts: dict[str, dict[int, dict[float, OpCounts]]], path: str) -> None:
+    """Writes the results in the format given by the suffix of path, see OUTPUT_FORMATS."""
+    suffix = os.path.splitext(path)[1]
+    if suffix == ".npz":
+        write_npz(times, counts, path)
+        return
+    with open(path, "w", newline="") as f:
+        if suffix == ".csv":
+            write_csv(times, counts, f)
+        else:
+            dump_times(times, counts, f)
+
+
+# The calibration table records, for each benchmarked (n, ratio) cell, the
+# algorithm mst should use there. It is written next to data.json.
+CALIBRATION_FILE = "calibration.json"
+CALIBRATION_VERSION = 1
+# mst only picks algorithms that run on a Graph as is, since the timings leave
+# out the conversions done by prepare, and that take any weights.
+DISPATCHABLE = [name for name, algorithm in ALGORITHMS.items()
+                if algorithm.prepare is _as_is and not algorithm.integer_weights]
+DEFAULT_ALGORITHM = "prim_heap"
+
+_calibration: Optional[dict[int, dict[float, str]]] = None
+
+
+def build_calibration(times: dict[str, dict[int, dict[float, TimingStats]]]) -> dict[int, dict[float, str]]:
+    """Picks the dispatchable algorithm with the lowest median time in each cell."""
+    table: dict[int, dict[float, str]] = {}
+    for name, t in times.items():
+        if name not in DISPATCHABLE:
+            continue
+        for n, d in t.items():
+            for ratio, stats in d.items():
+                best = table.setdefault(n, {}).get(ratio)
+                if best is None or stats.median < times[best][n][ratio].median:
+                    table[n][ratio] = name
+    return table
+
+
+def update_calibration(times: dict[str, dict[int, dict[float, TimingStats]]]) -> None:
+    """Merges the cells of a benchmark sweep into CALIBRATION_FILE.
+
+    Cells that were not swept keep their entries. A sweep that left out any
+    dispatchable algorithm is ignored, since the fastest of a subset need not
+    be the fastest of all.
+    """
+    global _calibration
+    missing = [name for name in DISPATCHABLE if name not in times]
+    if missing:
+        logging.info(f"Not updating {CALIBRATION_FILE}, the sweep did not time {', '.join(missing)}")
+        return
+    try:
+        with open(CALIBRATION_FILE) as f:
+            table = load_calibration(f)
+    except (OSError, ValueError, KeyError):
+        table = {}
+    for n, row in build_calibration(times).items():
+        table.setdefault(n, {}).update(row)
+
+    _calibration = table
+    with open(CALIBRATION_FILE, "w") as f:
+        dump_calibration(table, f)
+
+
+def dump_calibration(table: dict[int, dict[float, str]], f) -> None:
+    json.dump({"version": CALIBRATION_VERSION, "table": table}, f)
+
+
+def load_calibration(f) -> dict[int, dict[float, str]]:
+    data = json.load(f)
+    if data.get("version") != CALIBRATION_VERSION:
+        raise ValueError(f"Unsupported calibration version {data.get('version')}")
+    return {int(n): {float(r): name for r, name in d.items()} for n, d in data["table"].items()}
+
+
+def select_algorithm(n: int, m: int, table: Optional[dict[int, dict[float, str]]] = None) -> str:
+    """Returns the name of the algorithm calibrated for the cell nearest to n vertices and m edges.
+
+    The nearest n is taken on a log scale and the nearest ratio of m to the
+    n * (n - 1) / 2 possible edges on a linear one. Without a table, the one
+    in CALIBRATION_FILE is used, and DEFAULT_ALGORITHM if there is none.
+    """
+    global _calibration
+    if table is None:
+        if _calibration is None:
+            try:
+                with open(CALIBRATION_FILE) as f:
+                    _calibration = load_calibration(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Using {DEFAULT_ALGORITHM} for every graph, no calibration: {e}")
+                _calibration = {}
+        table = _calibration
+    if not table:
+        return DEFAULT_ALGORITHM
+
+    max_edges = n * (n - 1) // 2
+    ratio = m / max_edges if max_edges else 0.
+    nearest_n = min(table, key=lambda k: abs(math.log(k) - math.log(max(n, 1))))
+    row = table[nearest_n]
+    return row[min(row, key=lambda r: abs(r - ratio))]
+
+
+def mst(g: Graph, table: Optional[dict[int, dict[float, str]]] = None) -> list[Edge]:
+    """Finds a minimum spanning tree of g with the algorithm calibrated as fastest for its size.
+
+    Args:
+        g (Graph): The graph.
+        table (dict[int, dict[float, str]], optional): A calibration table, see select_algorithm.
+
+    Returns:
+        list[Edge]: The tree edges.
+    """
+    name = select_algorithm(g.num_vertices(), g.num_edges(), table)
+    return ALGORITHMS[name].run(g)
+
+
+def calibrate(ratios, ns, iterations, skip_tests, **kwargs) -> dict[int, dict[float, str]]:
+    """Writes CALIBRATION_FILE from a sweep of the dispatchable algorithms.
+
+    With skip_tests the table is built from the timings in data.json instead.
+    Other keyword arguments are passed on to time_functions.
+    """
+    global _calibration
+    if skip_tests:
         with open("data.json") as f:
-            d1, d2 = json.load(f)
-            times_heap = {int(k1): {float(k2): v for k2, v in d.items()}
-                          for k1, d in d1.items()}
-            times_unsorted_list = {
-                int(k1): {float(k2): v for k2, v in d.items()} for k1, d in d2.items()}
-    return times_heap, times_unsorted_list
-
-
-def parse_command_line_arguments():
-    if "--INFO" in sys.argv:
-        level = logging.INFO
-    elif "--DEBUG" in sys.argv:
-        level = logging.DEBUG
+            times, _ = load_times(f)
     else:
-        level = logging.WARNING
+        times, _ = time_functions(ratios, ns, iterations=iterations, algorithms=DISPATCHABLE, **kwargs)
+
+    table = build_calibration(times)
+    if not table:
+        raise ValueError(f"The timings have no dispatchable algorithm ({', '.join(DISPATCHABLE)})")
+    _calibration = table
+    with open(CALIBRATION_FILE, "w") as f:
+        dump_calibration(_calibration, f)
+    return _calibration
 
-    iterations = 100
-    for arg in sys.argv:
-        if "--iterations=" in arg:
-            iterations = int(arg.split("--iterations=")[-1])
 
-    skip_tests = "--skip-tests" in sys.argv
+def euclidean_graph(points: list[tuple[float, ...]]) -> Graph:
+    """Builds the complete Graph of a point set, weighted by Euclidean distance."""
+    return Graph.from_edge_list(len(points), ((i, j, math.dist(points[i], points[j]))
+                                             for i, j in itertools.combinations(range(len(points)), 2)))
 
-    return level, iterations, skip_tests
 
+# Ways of finding the MST of a point set, from the points. Unlike ALGORITHMS,
+# building the complete graph is part of what is timed.
+EUCLIDEAN_ALGORITHMS: dict[str, Callable[[list], list]] = {
+    "euclidean_mst": euclidean_mst,
+    "complete_graph_prim_heap": lambda points: prim_heap(euclidean_graph(points)),
+    "complete_graph_prim_dense": lambda points: prim_dense(*adjacency_matrix(euclidean_graph(points))),
+}
 
-def plot_data(times_heap, times_unsorted_list):
-    # sourcery skip: extract-duplicate-method
+
+def time_euclidean(ns: list[int], iterations: int = 1, seed: Optional[int] = None, repeat: int = 5,
+                   disable_gc: bool = True, dimensions: int = 2) -> dict[str, dict[int, dict[float, TimingStats]]]:
+    """Times EUCLIDEAN_ALGORITHMS on n random points in the unit square, for each n.
+
+    The results use the same layout as time_functions, with every cell at ratio 1.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    times: dict[str, dict[int, dict[float, TimingStats]]] = {name: {} for name in EUCLIDEAN_ALGORITHMS}
+    for n in ns:
+        logging.info(f"Running euclidean {n = }")
+        rng = _cell_rng(seed, n, 1.)
+        points = [tuple(rng.random() for _ in range(dimensions)) for _ in range(n)]
+        for name, run in EUCLIDEAN_ALGORITHMS.items():
+            times[name][n] = {1.: measure(lambda: run(points), number=iterations,
+                                          repeat=repeat, disable_gc=disable_gc)}
+    return times
+
+
+def get_data(ratios, ns, iterations, skip_tests, workers=1, pin_cpus=False, seed=None, cache=None,
+             repeat=5, disable_gc=True, count_ops=False, algorithms=None):
+    if not skip_tests:
+        times, counts = time_functions(ratios, ns, iterations=iterations, algorithms=algorithms,
+                                       workers=workers, pin_cpus=pin_cpus, seed=seed, cache=cache,
+                                       repeat=repeat, disable_gc=disable_gc, count_ops=count_ops)
+
+        with open("data.json", "w") as f:
+            dump_times(times, counts, f)
+        update_calibration(times)
+
+    else:
+        with open("data.json") as f:
+            times, counts = load_times(f)
+    return times, counts
+
+
+def _positive_int(text: str) -> int:
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an integer, not {text!r}") from None
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, not {text!r}")
+    return value
+
+
+def _sweep(kind: type) -> Callable[[str], list]:
+    # Parses one sweep value, either a number or an inclusive range start:stop:step.
+    def parse(text: str) -> list:
+        parts = text.split(":")
+        try:
+            if len(parts) == 1:
+                return [kind(text)]
+            if len(parts) == 3:
+                start, stop, step = (kind(p) for p in parts)
+                if step > 0:
+                    count = math.floor((stop - start) / step + 1e-9) + 1
+                    if count < 1:
+                        raise argparse.ArgumentTypeError(f"the range {text!r} has no values")
+                    return [kind(round(start + i * step, 10)) for i in range(count)]
+        except ValueError:
+            pass
+        raise argparse.ArgumentTypeError(f"expected a number or start:stop:step, not {text!r}")
+    return parse
+
+
+def _flatten(values: list[list]) -> list:
+    return sorted({v for vs in values for v in vs})
+
+
+def parse_command_line_arguments(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark minimum spanning tree algorithms on random graphs.")
+    parser.add_argument("command", nargs="?", choices=["benchmark", "calibrate", "euclidean"], default="benchmark",
+                        help="benchmark times the algorithms and plots the results, calibrate "
+                             "writes the table used by mst(), and euclidean compares euclidean_mst "
+                             "with building the complete graph of random points in the unit square "
+                             "for each of --ns (default: benchmark)")
+
+    grid = parser.add_argument_group("sweep")
+    grid.add_argument("--ns", nargs="+", type=_sweep(int), metavar="N",
+                      default=[[10, 20, 50, 100, 200, 500, 1000]],
+                      help="vertex counts, each a number or an inclusive range start:stop:step")
+    grid.add_argument("--ratios", nargs="+", type=_sweep(float), metavar="RATIO",
+                      default=[[0.01, 0.05, 0.1, 0.25, 0.35, 0.5, 0.65, 0.75, 0.9, 0.95, 0.99, 1.]],
+                      help="edge densities in (0, 1], as numbers or ranges")
+    grid.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), metavar="NAME",
+                      help=f"the algorithms to time (default: all of {', '.join(ALGORITHMS)})")
+    grid.add_argument("--seed", type=int, help=f"seed for the generated graphs (default: random, or {CACHE_SEED} with --cache-dir)")
+
+    timing = parser.add_argument_group("timing")
+    timing.add_argument("--iterations", type=_positive_int,
+                        help="calls per sample (default: 100, or 1 for euclidean, which builds a "
+                             "complete graph per call)")
+    timing.add_argument("--repeat", type=_positive_int, default=5, help="samples per cell (default: 5)")
+    timing.add_argument("--enable-gc", dest="disable_gc", action="store_false",
+                        help="leave the garbage collector on while timing")
+    timing.add_argument("--count-ops", action="store_true", help="also count APQ operations")
+
+    parallel = parser.add_argument_group("parallelism")
+    parallel.add_argument("--workers", type=_positive_int, default=1, help="processes to time cells in (default: 1)")
+    parallel.add_argument("--pin-cpus", action="store_true", help="bind each worker to its own CPU")
+    parallel.add_argument("--cache-dir", help="directory to cache generated graphs in")
+    parallel.add_argument("--cache-size", type=_positive_int, default=1024, help="graph cache size in MiB (default: 1024)")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--skip-tests", action="store_true",
+                        help="reload the timings from data.json instead of running the sweep")
+    output.add_argument("--output", action="append", default=[], metavar="FILE",
+                        help="also write the results to FILE, as JSON, CSV or NumPy .npz by its "
+                             "suffix. May be given more than once")
+    output.add_argument("--no-plots", dest="plots", action="store_false", help="do not draw the figures")
+    output.add_argument("--INFO", dest="level", action="store_const", const=logging.INFO, default=logging.WARNING)
+    output.add_argument("--DEBUG", dest="level", action="store_const", const=logging.DEBUG)
+
+    args = parser.parse_args(argv)
+    if args.iterations is None:
+        args.iterations = 1 if args.command == "euclidean" else 100
+    args.ns = _flatten(args.ns)
+    args.ratios = _flatten(args.ratios)
+    if any(n < 2 for n in args.ns):
+        parser.error("--ns must all be at least 2")
+    if any(not 0 < r <= 1 for r in args.ratios):
+        parser.error("--ratios must all be in (0, 1]")
+    for name in args.output:
+        if os.path.splitext(name)[1] not in OUTPUT_FORMATS:
+            parser.error(f"--output {name} must end in one of {', '.join(OUTPUT_FORMATS)}")
+
+    # The cache size is given in MiB
+    args.cache = None if args.cache_dir is None else GraphCache(args.cache_dir, args.cache_size << 20)
+    return args
+
+
+def _plot_stats(ax, d: dict, label: str) -> None:
+    # The median, with a band from the fastest sample to the 95th percentile.
+    xs = list(d.keys())
+    line, = ax.plot(xs, [s.median for s in d.values()], label=label)
+    ax.fill_between(xs, [s.min for s in d.values()], [s.p95 for s in d.values()],
+                    color=line.get_color(), alpha=0.2)
+
+
+def plot_data(times: dict[str, dict[int, dict[float, TimingStats]]]):
     # dict_zip is not written by me.
     # It is written by MCoding. Original source code can be found
     # here https://github.com/mCodingLLC/VideosSampleCode/blob/master/videos/101_zip_dict/zip_dict.py
     # I do not take any credit for writing dict_zip
-    ratio1, ratio2 = {}, {}
-    for n, d in times_heap.items():
-        for r, t in d.items():
-            if r not in ratio1:
-                ratio1[r] = {}
-            ratio1[r][n] = t
-
-    for n, d in times_unsorted_list.items():
-        for r, t in d.items():
-            if r not in ratio2:
-                ratio2[r] = {}
-            ratio2[r][n] = t
-
-    for n, d1, d2 in dict_zip(times_heap, times_unsorted_list):
+    labels = [ALGORITHMS[name].label if name in ALGORITHMS else name for name in times]
+
+    by_ratio: list[dict[float, dict[int, TimingStats]]] = []
+    for t in times.values():
+        by_ratio.append({})
+        for n, d in t.items():
+            for r, v in d.items():
+                by_ratio[-1].setdefault(r, {})[n] = v
+
+    for n, *ds in dict_zip(*times.values()):
         logging.info(f"Plotting {n = }")
 
         ax = plt.subplot()
 
         ax.set_title(f"{n = }")
 
-        ax.plot(d1.keys(), d1.values(), "r", label="Heap APQ")
-        ax.plot(d2.keys(), d2.values(), "b", label="Unsorted List APQ")
+        for label, d in zip(labels, ds):
+            _plot_stats(ax, d, label)
 
         ax.set_xlabel("ratio")
-        ax.set_ylabel("Time (s)")
+        ax.set_ylabel("Time per call (s)")
 
         ax.legend()
 
         plt.savefig(f"{PATH}{n=}")
         plt.cla()
 
-    for ratio, d1, d2 in dict_zip(ratio1, ratio2):
+    for ratio, *ds in dict_zip(*by_ratio):
         logging.info(f"Plotting {ratio = }")
 
         ax = plt.subplot()
 
         ax.set_title(f"{ratio = }")
 
-        ax.plot(d1.keys(), d1.values(), "r", label="Heap APQ")
-        ax.plot(d2.keys(), d2.values(), "b", label="Unsorted List APQ")
+        for label, d in zip(labels, ds):
+            _plot_stats(ax, d, label)
 
         ax.set_xlabel("n")
         ax.set_ylabel("Log Time")
@@ -217,21 +992,67 @@ def plot_data(times_heap, times_unsorted_list):
         plt.cla()
 
 
-def main() -> None:
+def plot_counts(counts: dict[str, dict[int, dict[float, OpCounts]]]):
+    labels = [ALGORITHMS[name].label if name in ALGORITHMS else name for name in counts]
+
+    for n, *ds in dict_zip(*counts.values()):
+        logging.info(f"Plotting operation counts for {n = }")
+
+        ax = plt.subplot()
+
+        ax.set_title(f"{n = }")
+
+        for label, d in zip(labels, ds):
+            ax.plot(d.keys(), [c.comparisons + c.swaps for c in d.values()], label=label)
+
+        # The theoretical bounds, with constant factor 1
+        ratios = list(ds[0].keys()) if ds else []
+        edges = [r * n * (n - 1) / 2 for r in ratios]
+        ax.plot(ratios, [e * math.log2(n) for e in edges], "k--", label="E log V")
+        ax.plot(ratios, [n ** 2] * len(ratios), "k:", label="V²")
+
+        ax.set_xlabel("ratio")
+        ax.set_ylabel("Comparisons + swaps")
+        ax.set_yscale("log")
+
+        ax.legend()
+
+        plt.savefig(f"{PATH}{n=} operations.png")
+        plt.cla()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+
+    args = parse_command_line_arguments(argv)
 
-    level, iterations, skip_tests = parse_command_line_arguments()
+    logging.basicConfig(level=args.level)
 
-    logging.basicConfig(level=level)
+    if args.command == "calibrate":
+        calibrate(args.ratios, args.ns, args.iterations, args.skip_tests, workers=args.workers,
+                  pin_cpus=args.pin_cpus, seed=args.seed, cache=args.cache, repeat=args.repeat,
+                  disable_gc=args.disable_gc)
+        return
 
-    ratios = [0.01, 0.05, 0.1, 0.25, 0.35,
-              0.5, 0.65, 0.75, 0.9, 0.95, 0.99, 1.]
+    if args.command == "euclidean":
+        times = time_euclidean(args.ns, args.iterations, args.seed, args.repeat, args.disable_gc)
+        for name, t in times.items():
+            for n, d in t.items():
+                print(f"{name:>28} {n = :>6}: {d[1.].median:.6f} s")
+        for path in args.output:
+            write_results(times, {}, path)
+        return
 
-    ns = [10, 20, 50, 100, 200, 500, 1000]
+    times, counts = get_data(args.ratios, args.ns, args.iterations, skip_tests=args.skip_tests,
+                             workers=args.workers, pin_cpus=args.pin_cpus, seed=args.seed, cache=args.cache,
+                             repeat=args.repeat, disable_gc=args.disable_gc, count_ops=args.count_ops,
+                             algorithms=args.algorithms)
 
-    times_heap, times_unsorted_list = get_data(
-        ratios, ns, iterations, skip_tests=skip_tests)
+    for path in args.output:
+        write_results(times, counts, path)
 
-    plot_data(times_heap, times_unsorted_list)
+    if args.plots:
+        plot_data(times)
+        plot_counts(counts)
 
 
 if __name__ == "__main__":
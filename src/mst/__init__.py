@@ -0,0 +1,10 @@
+from .batch import BatchPrim, prim_batch
+from .boruvka import boruvka
+from .dynamic import DynamicMST
+from .euclidean import euclidean_mst
+from .kruskal import kruskal
+from .memo import MemoizedMST
+from .service import MSTService, fingerprint
+from .union_find import UnionFind
+
+__all__ = ["BatchPrim", "boruvka", "DynamicMST", "euclidean_mst", "fingerprint", "kruskal", "MemoizedMST", "MSTService", "prim_batch", "UnionFind"]
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Union
+
+try:
+    from ..csr import CSRGraph
+    from ..priority_queue import IndexedHeapAPQ
+except ImportError:
+    from csr import CSRGraph
+    from priority_queue import IndexedHeapAPQ
+
+if TYPE_CHECKING:
+    from graph import Graph, Edge
+
+# Vertex states in BatchPrim.
+UNSEEN, QUEUED, DONE = 0, 1, 2
+
+
+class BatchPrim:
+    """Prim's algorithm with buffers that are reused from one graph to the next.
+
+    For small graphs, creating a queue, a locator dict and V Elements costs more
+    than the search itself. A BatchPrim keeps one IndexedHeapAPQ and its marker
+    arrays, and only grows them when a graph has more vertices than any before.
+    Vertices are only queued once they are reached, so the queue is empty
+    between graphs and needs no resetting.
+    """
+
+    def __init__(self, capacity: int = 0) -> None:
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self._apq = IndexedHeapAPQ(capacity)
+        # The key and parent of a vertex are only read while it is queued, so
+        # only the state buffer needs clearing for each graph.
+        self._state = bytearray(capacity)
+        self._key = [math.inf] * capacity
+        self._parent: list = [None] * capacity
+
+    def _reserve(self, n: int) -> None:
+        if n > self._apq.capacity():
+            self._allocate(max(n, 2 * self._apq.capacity()))
+
+    def solve(self, g: Union[Graph, CSRGraph]) -> Union[list[Edge], list[tuple[int, int, float]]]:
+        """Finds a minimum spanning forest of g.
+
+        Returns:
+            list[Edge] | list[tuple[int, int, float]]: The tree edges, or
+                (u, v, weight) triples for a CSRGraph, as from main.prim.
+        """
+        if isinstance(g, CSRGraph):
+            return self._solve_csr(g)
+        return self._solve_graph(g)
+
+    def _solve_csr(self, g: CSRGraph) -> list[tuple[int, int, float]]:
+        n = g.num_vertices()
+        self._reserve(n)
+        apq, state, key, parent = self._apq, self._state, self._key, self._parent
+        state[:n] = bytes(n)
+        offsets, targets, weights = g.offsets, g.targets, g.weights
+
+        tree = []
+        for root in range(n):
+            if state[root]:
+                continue
+            apq.add(root, 0.)
+            state[root] = QUEUED
+            parent[root] = -1
+            while apq.length():
+                v = apq.remove_min()
+                state[v] = DONE
+                if parent[v] >= 0:
+                    tree.append((parent[v], v, key[v]))
+
+                for i in range(offsets[v], offsets[v + 1]):
+                    w = targets[i]
+                    s = state[w]
+                    if s == UNSEEN:
+                        state[w] = QUEUED
+                        key[w] = weights[i]
+                        parent[w] = v
+                        apq.add(w, weights[i])
+                    elif s == QUEUED and weights[i] < key[w]:
+                        key[w] = weights[i]
+                        parent[w] = v
+                        apq.update_key(w, weights[i])
+        return tree
+
+    def _solve_graph(self, g: Graph) -> list[Edge]:
+        # Vertices are addressed by their ids in g.
+        n = g.id_bound()
+        self._reserve(n)
+        apq, state, key, parent = self._apq, self._state, self._key, self._parent
+        state[:n] = bytes(n)
+
+        tree = []
+        for root in g.vertex_ids():
+            if state[root]:
+                continue
+            apq.add(root, 0.)
+            state[root] = QUEUED
+            parent[root] = None
+            while apq.length():
+                i = apq.remove_min()
+                state[i] = DONE
+                if parent[i] is not None:
+                    tree.append(parent[i])
+
+                for j, e in g.adjacency(i):
+                    s = state[j]
+                    if s == UNSEEN:
+                        state[j] = QUEUED
+                        key[j] = e.weight
+                        parent[j] = e
+                        apq.add(j, e.weight)
+                    elif s == QUEUED and e.weight < key[j]:
+                        key[j] = e.weight
+                        parent[j] = e
+                        apq.update_key(j, e.weight)
+        return tree
+
+
+# Each worker process keeps its own BatchPrim between chunks.
+_solver: Optional[BatchPrim] = None
+
+
+def _solve_chunk(graphs: list) -> list:
+    global _solver
+    if _solver is None:
+        _solver = BatchPrim()
+    return [_solver.solve(g) for g in graphs]
+
+
+def prim_batch(graphs: Iterable[Union[Graph, CSRGraph]], workers: Optional[int] = None,
+               chunksize: int = 64) -> Iterator[Union[list[Edge], list[tuple[int, int, float]]]]:
+    """Finds the minimum spanning forest of each graph, yielding the results in order.
+
+    Args:
+        graphs (Iterable[Graph | CSRGraph]): The graphs. They are read lazily,
+            so this may be a generator.
+        workers (int, optional): If given, the graphs are sent to a pool of this
+            many processes in chunks. Only a few chunks per worker are in flight
+            at a time. Edges in the results are then copies of the originals.
+        chunksize (int, optional): The number of graphs sent to a worker at once.
+
+    Returns:
+        Iterator[list[Edge] | list[tuple[int, int, float]]]: The tree of each
+            graph, as from BatchPrim.solve.
+    """
+    if workers is None:
+        solver = BatchPrim()
+        for g in graphs:
+            yield solver.solve(g)
+        return
+
+    graphs = iter(graphs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(islice(graphs, chunksize))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_solve_chunk, chunk))
+            if not pending:
+                return
+            yield from pending.popleft().result()
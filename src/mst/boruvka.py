@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .union_find import UnionFind
+
+if TYPE_CHECKING:
+    from graph import Graph, Edge
+
+
+def boruvka(g: Graph) -> list[Edge]:
+    """Borůvka's algorithm: every component adds its cheapest outgoing edge each round.
+
+    There are at most log2(V) rounds. Ties are broken by edge position so that
+    the chosen edges can never form a cycle. Returns a minimum spanning forest
+    if g is disconnected.
+
+    Args:
+        g (Graph): The graph.
+
+    Returns:
+        list[Edge]: The tree edges.
+    """
+    index = {v: i for i, v in enumerate(g.vertices)}
+    uf = UnionFind(len(index))
+    edges = g.edges
+    # (weight, position, u, v) for every edge that still joins two components.
+    live = [(e.weight, k, index[e.vertex_1], index[e.vertex_2]) for k, e in enumerate(edges)]
+
+    tree = []
+    while live and uf.components() > 1:
+        cheapest: dict[int, tuple] = {}
+        remaining = []
+        for c in live:
+            a, b = uf.find(c[2]), uf.find(c[3])
+            if a == b:
+                continue
+            remaining.append(c)
+            if a not in cheapest or c < cheapest[a]:
+                cheapest[a] = c
+            if b not in cheapest or c < cheapest[b]:
+                cheapest[b] = c
+
+        for c in set(cheapest.values()):
+            if uf.union(c[2], c[3]):
+                tree.append(edges[c[1]])
+        live = remaining
+    return tree
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+
+from .kruskal import kruskal
+
+try:
+    from ..graph import DoesNotExistError
+except ImportError:
+    from graph import DoesNotExistError
+
+if TYPE_CHECKING:
+    from graph import Graph, Edge, Vertex
+
+
+class DynamicMST:
+    """Keeps a minimum spanning forest of a Graph up to date as its edges change.
+
+    Edges must be added and removed through this object so that the tree is
+    updated along with the graph. Each update costs O(V + the degrees of one
+    side of the cut) instead of recomputing the tree from scratch.
+    """
+
+    def __init__(self, g: Graph) -> None:
+        self.graph = g
+        self._tree: dict[Vertex, dict[Vertex, Edge]] = {v: {} for v in g.vertices}
+        for e in kruskal(g):
+            self._link(e)
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(edges=[{', '.join(str(e) for e in self.edges)}])"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    @property
+    def edges(self) -> list[Edge]:
+        return list({id(e): e for d in self._tree.values() for e in d.values()}.values())
+
+    def weight(self) -> int:
+        return sum(e.weight for e in self.edges)
+
+    def in_tree(self, e: Edge) -> bool:
+        d = self._tree[e.vertex_1].get(e.vertex_2)
+        return d is not None and d == e
+
+    def add_vertex(self, x: Vertex) -> None:
+        self.graph.add_vertex(x)
+        self._tree[x] = {}
+
+    def add_edge(self, x: Vertex, y: Vertex, e: Edge) -> None:
+        """Adds e to the graph and, by the cycle property, swaps it into the tree
+        if it is lighter than the heaviest tree edge on the path from x to y."""
+        try:
+            # The graph keeps one edge per pair, so e replaces any existing edge.
+            self.remove_edge(self.graph.get_edge(x, y))
+        except DoesNotExistError:
+            pass
+        self.graph.add_edge(x, y, e)
+        if x is y:
+            # A self-loop closes a cycle on its own, so is never in the tree
+            return
+
+        path = self._path(x, y)
+        if path is None:
+            self._link(e)
+            return
+        heaviest = max(path, key=lambda d: d.weight)
+        if e.weight < heaviest.weight:
+            self._cut(heaviest)
+            self._link(e)
+
+    def remove_edge(self, e: Edge) -> None:
+        """Removes e from the graph and, if it was a tree edge, reconnects the
+        two halves with the lightest edge across the cut."""
+        self.graph.remove_edge(e)
+        if not self.in_tree(e):
+            return
+        self._cut(e)
+
+        side = self._component(e.vertex_1)
+        if 2 * len(side) > len(self._tree):
+            side = self._component(e.vertex_2)
+
+        best: Optional[Edge] = None
+        for v in side:
+            for d in self.graph.get_edges(v):
+                if d.opposite(v) not in side and (best is None or d.weight < best.weight):
+                    best = d
+        if best is not None:
+            self._link(best)
+
+    def _link(self, e: Edge) -> None:
+        self._tree[e.vertex_1][e.vertex_2] = e
+        self._tree[e.vertex_2][e.vertex_1] = e
+
+    def _cut(self, e: Edge) -> None:
+        del self._tree[e.vertex_1][e.vertex_2]
+        del self._tree[e.vertex_2][e.vertex_1]
+
+    def _path(self, x: Vertex, y: Vertex) -> Optional[list[Edge]]:
+        # The tree edges from x to y, or None if they are in different trees.
+        parent: dict[Vertex, Optional[Edge]] = {x: None}
+        queue = deque([x])
+        while queue:
+            v = queue.popleft()
+            if v == y:
+                path = []
+                while parent[v] is not None:
+                    path.append(parent[v])
+                    v = parent[v].opposite(v)
+                return path
+            for w, e in self._tree[v].items():
+                if w not in parent:
+                    parent[w] = e
+                    queue.append(w)
+        return None
+
+    def _component(self, x: Vertex) -> set[Vertex]:
+        seen = {x}
+        stack = [x]
+        while stack:
+            for w in self._tree[stack.pop()]:
+                if w not in seen:
+                    seen.add(w)
+                    stack.append(w)
+        return seen
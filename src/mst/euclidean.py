@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+
+def euclidean_mst(points: Sequence[Sequence[float]]) -> list[tuple[int, int, float]]:
+    """Prim's algorithm on the complete graph of a point set, without building the graph.
+
+    Distances are computed when needed. Each step finds the nearest point
+    outside the tree with one argmin, then computes the distances from that
+    point to every point still outside the tree in a single vectorised
+    block. The points outside the tree are kept packed at the front of the
+    working arrays, so the blocks shrink as the tree grows. This takes
+    O(V^2 d) time but only O(V d) memory, against O(V^2) Edge objects for
+    the complete Graph.
+
+    Args:
+        points (Sequence[Sequence[float]]): The coordinates of each point, or
+            an (n, d) array.
+
+    Returns:
+        list[tuple[int, int, float]]: The tree as (u, v, distance) triples,
+            where u is already in the tree when v is added.
+    """
+    import numpy as np
+
+    coords = np.asarray(points, dtype=np.float64)
+    if coords.ndim == 1:
+        coords = coords.reshape(-1, 1)
+    n = len(coords)
+    if n < 2:
+        return []
+
+    # Working arrays for the points outside the tree, packed into [:m].
+    ids = np.arange(1, n)
+    outside = coords[1:].copy()
+    key = ((outside - coords[0]) ** 2).sum(axis=1)
+    parent = np.zeros(n - 1, dtype=np.intp)
+
+    tree = []
+    for m in range(n - 1, 0, -1):
+        j = int(np.argmin(key[:m]))
+        v, p = int(ids[j]), outside[j].copy()
+        tree.append((int(parent[j]), v, float(np.sqrt(key[j]))))
+
+        # Move the last point outside the tree into the hole left by v.
+        last = m - 1
+        ids[j], outside[j], key[j], parent[j] = ids[last], outside[last], key[last], parent[last]
+
+        d = ((outside[:last] - p) ** 2).sum(axis=1)
+        closer = d < key[:last]
+        key[:last][closer] = d[closer]
+        parent[:last][closer] = v
+    return tree
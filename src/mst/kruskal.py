@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from operator import attrgetter
+from typing import TYPE_CHECKING
+
+from .union_find import UnionFind
+
+if TYPE_CHECKING:
+    from graph import Graph, Edge
+
+
+def kruskal(g: Graph) -> list[Edge]:
+    """Kruskal's algorithm: add edges in weight order unless they close a cycle.
+
+    Returns a minimum spanning forest if g is disconnected.
+
+    Args:
+        g (Graph): The graph.
+
+    Returns:
+        list[Edge]: The tree edges in increasing weight order.
+    """
+    index = {v: i for i, v in enumerate(g.vertices)}
+    uf = UnionFind(len(index))
+
+    tree = []
+    for e in sorted(g.edges, key=attrgetter("weight")):
+        if uf.union(index[e.vertex_1], index[e.vertex_2]):
+            tree.append(e)
+            if uf.components() == 1:
+                break
+    return tree
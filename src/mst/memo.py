@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Union
+
+try:
+    from ..csr import CSRGraph
+except ImportError:
+    from csr import CSRGraph
+
+from .service import fingerprint
+
+if TYPE_CHECKING:
+    from graph import Graph
+
+
+class MemoizedMST:
+    """Wraps an MST function, such as main.prim_heap, with an LRU cache of its results.
+
+    A Graph is looked up by Graph.fingerprint, which costs O(1). A CSRGraph is
+    looked up by mst.fingerprint, which hashes its arrays. Graphs with the
+    same content share a result, so the edges returned may belong to an
+    equal graph that was solved earlier.
+
+    Args:
+        engine (Callable): The MST function.
+        max_size (int, optional): The number of results to keep.
+    """
+
+    def __init__(self, engine: Callable, max_size: int = 128) -> None:
+        self.engine = engine
+        self.max_size = max_size
+        self._cache: OrderedDict[tuple, list] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self.engine.__name__}, hits={self.hits}, misses={self.misses})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __call__(self, g: Union[Graph, CSRGraph]) -> list:
+        """Returns a copy of the cached tree of g, computing it on a miss."""
+        if isinstance(g, CSRGraph):
+            key = ("csr", fingerprint(g))
+        else:
+            key = ("graph", g.fingerprint, g.num_vertices(), g.num_edges())
+
+        tree = self._cache.get(key)
+        if tree is None:
+            self.misses += 1
+            tree = self._cache[key] = self.engine(g)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        return list(tree)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
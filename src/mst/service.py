@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, Optional, Union
+
+try:
+    from ..csr import CSRGraph
+    from ..timing import TimingStats
+except ImportError:
+    from csr import CSRGraph
+    from timing import TimingStats
+
+if TYPE_CHECKING:
+    from graph import Graph
+
+
+def fingerprint(g: Union[Graph, CSRGraph]) -> str:
+    """Returns a digest that is equal for graphs with the same labelled, weighted edges.
+
+    For a Graph this is Graph.fingerprint, so it is only comparable within
+    one process. A CSRGraph is hashed from its arrays.
+    """
+    if not isinstance(g, CSRGraph):
+        return f"graph-{g.fingerprint:016x}-{g.num_vertices()}-{g.num_edges()}"
+
+    h = hashlib.blake2b(digest_size=16)
+    for a in (g.offsets, g.targets, g.weights):
+        h.update(memoryview(a).cast("B"))
+    if g.labels is not None:
+        h.update(repr(list(g.labels)).encode())
+    return f"csr-{h.hexdigest()}"
+
+
+class MSTService:
+    """Computes minimum spanning trees for asyncio code without blocking the event loop.
+
+    Each computation runs engine(g) in an executor. Results are cached by
+    graph fingerprint, and a request for a graph that is already being
+    computed waits for that computation instead of starting another one.
+
+    Use it as an async context manager, or call close when done::
+
+        async with MSTService(prim_heap, workers=4) as service:
+            tree = await service.solve(g)
+
+    Args:
+        engine (Callable): The MST function, such as main.prim_heap. With a
+            process pool it must be importable by the workers.
+        executor (Executor, optional): Where to run engine. Defaults to a
+            ProcessPoolExecutor owned by the service.
+        workers (int, optional): The size of the default process pool.
+        cache_size (int, optional): The number of results to keep.
+        latency_window (int, optional): The number of recent request
+            latencies kept for the metrics.
+    """
+
+    def __init__(self, engine: Callable, executor: Optional[Executor] = None, workers: Optional[int] = None,
+                 cache_size: int = 128, latency_window: int = 10_000) -> None:
+        self.engine = engine
+        self._owns_executor = executor is None
+        self._executor = ProcessPoolExecutor(max_workers=workers) if executor is None else executor
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, list] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+
+        self.requests = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.computed = 0
+        self.max_queue_depth = 0
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self.engine.__name__}, requests={self.requests})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    async def __aenter__(self) -> MSTService:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shuts down the executor if the service created it."""
+        if self._owns_executor:
+            self._executor.shutdown()
+
+    def queue_depth(self) -> int:
+        """Returns the number of computations submitted and not yet finished."""
+        return len(self._in_flight)
+
+    async def solve(self, g: Union[Graph, CSRGraph]) -> list:
+        """Returns the minimum spanning tree of g as computed by the engine.
+
+        The graph must not be changed until the call returns. Each caller gets
+        its own copy of the result list.
+        """
+        start = time.perf_counter()
+        self.requests += 1
+        key = fingerprint(g)
+
+        tree = self._cache.get(key)
+        if tree is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        else:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                future = asyncio.get_running_loop().run_in_executor(self._executor, self.engine, g)
+                self._in_flight[key] = future
+                self.max_queue_depth = max(self.max_queue_depth, len(self._in_flight))
+                future.add_done_callback(lambda f: self._finish(key, f))
+            # shield stops a cancelled caller from cancelling the computation
+            # that other callers are waiting for.
+            tree = await asyncio.shield(future)
+
+        self._latencies.append(time.perf_counter() - start)
+        return list(tree)
+
+    def _finish(self, key: str, future: asyncio.Future) -> None:
+        del self._in_flight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.computed += 1
+        self._cache[key] = future.result()
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def metrics(self) -> dict:
+        """Returns counters, the current queue depth and a summary of recent latencies in seconds."""
+        latency = TimingStats.from_samples(list(self._latencies)).to_dict() if self._latencies else None
+        return {"requests": self.requests,
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "computed": self.computed,
+                "queue_depth": self.queue_depth(),
+                "max_queue_depth": self.max_queue_depth,
+                "cached": len(self._cache),
+                "latency": latency}
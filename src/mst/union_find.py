@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+
+class UnionFind:
+    """A disjoint-set forest over the integers 0..n-1 with path compression and union by rank."""
+
+    def __init__(self, n: int) -> None:
+        self._parent = list(range(n))
+        self._rank = [0] * n
+        self._count = n
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def components(self) -> int:
+        """Returns the number of disjoint sets."""
+        return self._count
+
+    def find(self, x: int) -> int:
+        """Returns the representative of the set containing x."""
+        parent = self._parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, x: int, y: int) -> bool:
+        """Merges the sets containing x and y.
+
+        Returns:
+            bool: False if x and y were already in the same set.
+        """
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        if self._rank[x] < self._rank[y]:
+            x, y = y, x
+        self._parent[y] = x
+        if self._rank[x] == self._rank[y]:
+            self._rank[x] += 1
+        self._count -= 1
+        return True
+
+    def connected(self, x: int, y: int) -> bool:
+        return self.find(x) == self.find(y)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import TypeVar, Generic
+from dataclasses import asdict, dataclass, field
+from typing import TypeVar, Generic, Optional, Sequence
 from abc import ABC, abstractmethod
+from array import array
+import math
 import sys
 
 
@@ -19,6 +21,10 @@ class Element(Generic[T]):
 
 
 class APQ(ABC):
+    # Whether the queue orders its Elements by comparing their keys. Only
+    # then do instrumented subclasses wrap keys to count comparisons.
+    compares_keys = True
+
     def __init__(self) -> None:
         self._queue: list[Element[T]] = []
 
@@ -47,6 +53,16 @@ class APQ(ABC):
         """
         return element.key
 
+    @classmethod
+    def instrumented(cls) -> type:
+        """Returns a subclass of this APQ that counts its operations.
+
+        Instances of the subclass have a ``counts`` attribute holding an OpCounts.
+        Counting lives entirely in the subclass, so the uninstrumented classes
+        pay nothing for it.
+        """
+        return instrumented(cls)
+
     @abstractmethod
     def min(self) -> T:
         """Returns the highest priority item.
@@ -95,30 +111,17 @@ class APQ(ABC):
 
 class HeapAPQ(APQ):
     def _bubble_down(self, i: int) -> None:
-        n = self.length() - 1
+        n = self.length()
         while True:
             l, r = 2 * i + 1, 2 * i + 2
             if l >= n:
                 break
-            if r >= n:
-                if self._queue[i] < self._queue[r]:
-                    break
-                self._queue[i], self._queue[r] = self._queue[r], self._queue[i]
-                self._queue[i].index, self._queue[r].index = i, r
-                i = r
-            elif self._queue[l] < self._queue[r]:
-                if self._queue[i] < self._queue[l]:
-                    break
-
-                self._queue[i], self._queue[l] = self._queue[l], self._queue[i]
-                self._queue[i].index, self._queue[l].index = i, l
-                i = l
-            elif self._queue[i] < self._queue[r]:
+            c = r if r < n and self._queue[r] < self._queue[l] else l
+            if not self._queue[c] < self._queue[i]:
                 break
-            else:
-                self._queue[i], self._queue[r] = self._queue[r], self._queue[i]
-                self._queue[i].index, self._queue[r].index = i, r
-                i = r
+            self._queue[i], self._queue[c] = self._queue[c], self._queue[i]
+            self._queue[i].index, self._queue[c].index = i, c
+            i = c
 
     def _bubble_up(self, i: int) -> None:
         while (self._queue[(i - 1) // 2] > self._queue[i]) and i != 0:
@@ -166,11 +169,14 @@ class HeapAPQ(APQ):
     def remove(self, element: Element) -> tuple[int, T]:
         if self.length() < 1:
             raise IndexError("Cannot remove item from empty APQ")
-        n = self.length() - 1
-        self._queue[element.index], self._queue[n] = self._queue[n], self._queue[element.index]
+        i, n = element.index, self.length() - 1
+        self._queue[i], self._queue[n] = self._queue[n], self._queue[i]
+        self._queue[i].index = i
+        self._queue.pop()
 
-        self._bubble_down(element.index)
-        self._bubble_up(element.index)
+        if i < n:
+            self._bubble_down(i)
+            self._bubble_up(i)
 
         return element.key, element.value
 
@@ -214,3 +220,623 @@ class UnsortedListAPQ(APQ):
         n = self.length() - 1
         self._queue[element.index], self._queue[n] = self._queue[n], self._queue[element.index]
         self._queue[element.index].index = element.index
+
+
+class DaryHeapAPQ(HeapAPQ):
+    """A heap where each node has d children.
+
+    A wider heap is shallower, so _bubble_up (used by add and by decreasing a key)
+    does fewer swaps, at the cost of scanning d children in _bubble_down.
+    """
+
+    def __init__(self, d: int = 4) -> None:
+        if d < 2:
+            raise ValueError(f"A d-ary heap needs d >= 2, got {d}")
+        super().__init__()
+        self.d = d
+
+    def _bubble_down(self, i: int) -> None:
+        n = self.length()
+        while True:
+            first = self.d * i + 1
+            if first >= n:
+                break
+            c = first
+            for j in range(first + 1, min(first + self.d, n)):
+                if self._queue[j] < self._queue[c]:
+                    c = j
+            if not self._queue[c] < self._queue[i]:
+                break
+            self._queue[i], self._queue[c] = self._queue[c], self._queue[i]
+            self._queue[i].index, self._queue[c].index = i, c
+            i = c
+
+    def _bubble_up(self, i: int) -> int:
+        while i != 0 and self._queue[i] < self._queue[(i - 1) // self.d]:
+            p = (i - 1) // self.d
+            self._queue[i], self._queue[p] = self._queue[p], self._queue[i]
+            self._queue[i].index, self._queue[p].index = i, p
+            i = p
+        return i
+
+
+@dataclass(order=True, **({"slots": True} if py310 else {}))
+class PairingElement(Element[T]):
+    child: Optional[PairingElement[T]] = field(default=None, compare=False, repr=False)
+    sibling: Optional[PairingElement[T]] = field(default=None, compare=False, repr=False)
+    # The previous sibling, or the parent for a leftmost child.
+    prev: Optional[PairingElement[T]] = field(default=None, compare=False, repr=False)
+
+
+class PairingHeapAPQ(APQ):
+    """A pairing heap with amortised O(1) add and decrease-key.
+
+    The elements form a tree of PairingElements rather than living in _queue.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._root: Optional[PairingElement] = None
+        self._size = 0
+
+    def length(self) -> int:
+        return self._size
+
+    def min(self) -> T:
+        if self._root is None:
+            raise IndexError("Cannot get the min of an empty APQ")
+        return self._root.value
+
+    def add(self, key: int, value: T) -> Element:
+        e = PairingElement(key, value, 0)
+        self._root = e if self._root is None else self._meld(self._root, e)
+        self._size += 1
+        return e
+
+    def remove_min(self) -> T:
+        if self.length() < 1:
+            raise IndexError("Cannot remove item from empty APQ")
+        e = self._root
+        self._detach(e)
+        self._size -= 1
+        return e.value
+
+    def update_key(self, element: PairingElement, key: int) -> None:
+        if key < element.key:
+            element.key = key
+            if element is not self._root:
+                self._cut(element)
+                self._root = self._meld(self._root, element)
+        elif key > element.key:
+            self._detach(element)
+            element.key = key
+            self._root = element if self._root is None else self._meld(self._root, element)
+
+    def remove(self, element: PairingElement) -> tuple[int, T]:
+        if self.length() < 1:
+            raise IndexError("Cannot remove item from empty APQ")
+        self._detach(element)
+        self._size -= 1
+        return element.key, element.value
+
+    @staticmethod
+    def _meld(a: PairingElement, b: PairingElement) -> PairingElement:
+        # Both arguments must be roots. The larger becomes the leftmost child of the smaller.
+        if b < a:
+            a, b = b, a
+        b.prev = a
+        b.sibling = a.child
+        if a.child is not None:
+            a.child.prev = b
+        a.child = b
+        return a
+
+    @staticmethod
+    def _cut(element: PairingElement) -> None:
+        # Unlinks a non-root element, with its subtree, from its parent and siblings.
+        if element.prev.child is element:
+            element.prev.child = element.sibling
+        else:
+            element.prev.sibling = element.sibling
+        if element.sibling is not None:
+            element.sibling.prev = element.prev
+        element.prev = element.sibling = None
+
+    def _merge_pairs(self, first: Optional[PairingElement]) -> Optional[PairingElement]:
+        # Standard two-pass merge: meld siblings in pairs left to right, then fold right to left.
+        pairs = []
+        a = first
+        while a is not None:
+            b = a.sibling
+            if b is None:
+                a.prev = None
+                pairs.append(a)
+                break
+            rest = b.sibling
+            a.prev = a.sibling = b.prev = b.sibling = None
+            pairs.append(self._meld(a, b))
+            a = rest
+
+        if not pairs:
+            return None
+        root = pairs.pop()
+        while pairs:
+            root = self._meld(pairs.pop(), root)
+        return root
+
+    def _detach(self, element: PairingElement) -> None:
+        # Takes a single element out of the heap, melding its children back in.
+        children = self._merge_pairs(element.child)
+        element.child = None
+        if element is self._root:
+            self._root = children
+        else:
+            self._cut(element)
+            if children is not None:
+                self._root = self._meld(self._root, children)
+
+
+class _IntegerKeyAPQ(APQ):
+    """The parts shared by queues that keep Elements in buckets by integer key.
+
+    Keys are integers in [0, max_key] or math.inf, which always has the last
+    bucket. Subclasses say which bucket a key goes in, where an Element is
+    put, and which bucket holds the minimum.
+    """
+    compares_keys = False
+
+    def __init__(self, max_key: int, buckets: int) -> None:
+        if max_key < 0:
+            raise ValueError(f"{self.__class__.__name__} needs max_key >= 0, got {max_key}")
+        super().__init__()
+        self.max_key = max_key
+        self._buckets: list[list[Element]] = [[] for _ in range(buckets)]
+        self._inf = buckets - 1
+        self._size = 0
+
+    def length(self) -> int:
+        return self._size
+
+    def _check(self, key: float) -> float:
+        # Returns key as an int, or math.inf.
+        if key == math.inf:
+            return math.inf
+        k = int(key)
+        if k != key or not 0 <= k <= self.max_key:
+            raise ValueError(f"Keys must be integers in [0, {self.max_key}] or math.inf, got {key}")
+        return k
+
+    @abstractmethod
+    def _index(self, key: float) -> int:
+        """Returns the bucket that an Element with this checked key is in."""
+
+    @abstractmethod
+    def _insert(self, element: Element) -> None:
+        """Puts the element in its bucket."""
+
+    @abstractmethod
+    def _lowest(self) -> list[Element]:
+        """Returns a non-empty bucket whose Elements all have the smallest key."""
+
+    def _put(self, element: Element, i: int) -> None:
+        bucket = self._buckets[i]
+        element.index = len(bucket)
+        bucket.append(element)
+
+    def _take(self, element: Element) -> None:
+        # Swaps the element with the end of its bucket and pops it.
+        bucket = self._buckets[self._index(element.key)]
+        last = bucket.pop()
+        if last is not element:
+            bucket[element.index] = last
+            last.index = element.index
+
+    def min(self) -> T:
+        return self._lowest()[-1].value
+
+    def add(self, key: int, value: T) -> Element:
+        e = Element(self._check(key), value, 0)
+        self._insert(e)
+        self._size += 1
+        return e
+
+    def remove_min(self) -> T:
+        if self._size < 1:
+            raise IndexError("Cannot remove item from empty APQ")
+        self._size -= 1
+        return self._lowest().pop().value
+
+    def update_key(self, element: Element, key: int) -> None:
+        key = self._check(key)
+        self._take(element)
+        element.key = key
+        self._insert(element)
+
+    def remove(self, element: Element) -> tuple[int, T]:
+        if self._size < 1:
+            raise IndexError("Cannot remove item from empty APQ")
+        self._take(element)
+        self._size -= 1
+        return element.key, element.value
+
+
+class BucketAPQ(_IntegerKeyAPQ):
+    """A bucket queue (Dial's queue) for integer keys in [0, max_key], plus math.inf.
+
+    There is one list of Elements per key, and one more for math.inf, so add,
+    update_key and remove are O(1). remove_min moves a cursor up to the lowest
+    non-empty bucket. Keys are not required to be monotone: adding a key below
+    the cursor just moves the cursor back down. This makes remove_min
+    O(max_key) in the worst case, which is cheap when keys are small, as
+    with Prim's algorithm on small integer weights.
+
+    Args:
+        max_key (int, optional): The largest finite key.
+    """
+
+    def __init__(self, max_key: int = 255) -> None:
+        super().__init__(max_key, max_key + 2)
+        # Every bucket below _cursor is empty.
+        self._cursor = 0
+
+    def _index(self, key: float) -> int:
+        return self._inf if key == math.inf else key
+
+    def _insert(self, element: Element) -> None:
+        i = self._index(element.key)
+        self._put(element, i)
+        if i < self._cursor:
+            self._cursor = i
+
+    def _lowest(self) -> list[Element]:
+        buckets, i = self._buckets, self._cursor
+        while not buckets[i]:
+            i += 1
+        self._cursor = i
+        return buckets[i]
+
+
+class RadixHeapAPQ(_IntegerKeyAPQ):
+    """A radix heap for integer keys in [0, max_key], plus math.inf.
+
+    Elements are bucketed by the highest bit in which their key differs from
+    a base key that is at most every queued key. That is O(log max_key)
+    buckets rather than one per key, so wide key ranges are fine. When the
+    lowest bucket empties, remove_min makes the smallest key in the next
+    bucket the new base, and redistributes that bucket into lower ones.
+
+    A textbook radix heap needs keys that never drop below the last key
+    removed, which Prim's algorithm does not guarantee. A lower key instead
+    becomes the new base. Only the elements in buckets below the highest bit
+    where the old and new bases differ change bucket, and they all move into
+    that one.
+
+    Args:
+        max_key (int, optional): The largest finite key.
+    """
+
+    def __init__(self, max_key: int = 2 ** 32 - 1) -> None:
+        super().__init__(max_key, max_key.bit_length() + 2)
+        self._base = 0
+
+    def _index(self, key: float) -> int:
+        return self._inf if key == math.inf else (key ^ self._base).bit_length()
+
+    def _insert(self, element: Element) -> None:
+        if element.key < self._base:
+            self._rebase(element.key)
+        self._put(element, self._index(element.key))
+
+    def _rebase(self, base: int) -> None:
+        # Buckets from h up keep their elements under the new base.
+        h = (self._base ^ base).bit_length()
+        target = self._buckets[h]
+        for bucket in self._buckets[:h]:
+            for e in bucket:
+                e.index = len(target)
+                target.append(e)
+            bucket.clear()
+        self._base = base
+
+    def _lowest(self) -> list[Element]:
+        buckets = self._buckets
+        if buckets[0]:
+            return buckets[0]
+        i = 1
+        while i < self._inf and not buckets[i]:
+            i += 1
+        if i == self._inf:
+            return buckets[i]
+
+        bucket = buckets[i]
+        buckets[i] = []
+        base = self._base = min(bucket).key
+        for e in bucket:
+            # Every element moves to a bucket below i.
+            target = buckets[(e.key ^ base).bit_length()]
+            e.index = len(target)
+            target.append(e)
+        return buckets[0]
+
+
+class IndexedHeapAPQ:
+    """A binary heap over the integer ids 0..capacity-1.
+
+    Unlike the APQ classes, items are addressed by their id instead of by an
+    Element handle. Keys, values and heap positions live in preallocated
+    parallel arrays, so add, update_key and remove_min allocate nothing.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._keys = array("d", bytes(array("d").itemsize * capacity))
+        self._values: list = [None] * capacity
+        self._heap = array("l", bytes(array("l").itemsize * capacity))
+        # The position of each id in _heap, or -1 if it is not queued.
+        self._pos = array("l", [-1]) * capacity
+        self._size = 0
+
+    def __str__(self) -> str:
+        return repr(self)
+
+    def __repr__(self) -> str:
+        items = ", ".join(f"{i}: {self._keys[i]}" for i in self._heap[:self._size])
+        return f"{self.__class__.__name__}({items})"
+
+    def __contains__(self, i: int) -> bool:
+        return self._pos[i] >= 0
+
+    def capacity(self) -> int:
+        return len(self._pos)
+
+    def length(self) -> int:
+        return self._size
+
+    def heapify(self, keys: Sequence[float], values: Optional[Sequence[T]] = None) -> None:
+        """Replaces the contents of the queue with the ids 0..len(keys)-1 in O(n).
+
+        Args:
+            keys (Sequence[float]): The key of each id.
+            values (Sequence[T], optional): The value of each id.
+        """
+        n = len(keys)
+        if n > self.capacity():
+            raise ValueError(f"Cannot heapify {n} items into a queue of capacity {self.capacity()}")
+        for i in self._heap[:self._size]:
+            self._pos[i] = -1
+
+        for i in range(n):
+            self._keys[i] = keys[i]
+            self._values[i] = None if values is None else values[i]
+            self._heap[i] = i
+            self._pos[i] = i
+        self._size = n
+
+        for i in range(n // 2 - 1, -1, -1):
+            self._sift_down(i)
+
+    def get_key(self, i: int) -> float:
+        return self._keys[i]
+
+    def get_value(self, i: int) -> T:
+        return self._values[i]
+
+    def min(self) -> int:
+        """Returns the id with the highest priority."""
+        return self._heap[0]
+
+    def add(self, i: int, key: float, value: Optional[T] = None) -> None:
+        """Adds the id i to the queue.
+
+        Args:
+            i (int): The id to be added.
+            key (float): The priority of the id. Smaller numbers are higher priority.
+            value (T, optional): A value stored alongside the id.
+        """
+        if self._pos[i] >= 0:
+            raise ValueError(f"{i} is already in the APQ")
+        self._keys[i] = key
+        self._values[i] = value
+        self._heap[self._size] = i
+        self._pos[i] = self._size
+        self._size += 1
+        self._sift_up(self._size - 1)
+
+    def remove_min(self) -> int:
+        """Returns and removes the id with the highest priority.
+
+        Its key and value stay readable through get_key and get_value.
+        """
+        if self._size < 1:
+            raise IndexError("Cannot remove item from empty APQ")
+        i = self._heap[0]
+        self._pos[i] = -1
+        self._size -= 1
+        if self._size:
+            last = self._heap[self._size]
+            self._heap[0] = last
+            self._pos[last] = 0
+            self._sift_down(0)
+        return i
+
+    def update_key(self, i: int, key: float, value: Optional[T] = None) -> None:
+        """Update the priority of a queued id, and its value if one is given."""
+        j = self._pos[i] if 0 <= i < self.capacity() else -1
+        if j < 0:
+            raise IndexError(f"{i} is not in the APQ")
+        old_key = self._keys[i]
+        self._keys[i] = key
+        if value is not None:
+            self._values[i] = value
+        if key < old_key:
+            self._sift_up(j)
+        else:
+            self._sift_down(j)
+
+    def remove(self, i: int) -> tuple[float, T]:
+        """Remove the id i.
+
+        Returns:
+            tuple[float, T]: A (key, value) pair of the id's key and value.
+        """
+        j = self._pos[i] if 0 <= i < self.capacity() else -1
+        if j < 0:
+            raise IndexError(f"{i} is not in the APQ")
+        self._pos[i] = -1
+        self._size -= 1
+        if j < self._size:
+            last = self._heap[self._size]
+            self._heap[j] = last
+            self._pos[last] = j
+            self._sift_down(j)
+            self._sift_up(self._pos[last])
+        return self._keys[i], self._values[i]
+
+    def _sift_up(self, j: int) -> None:
+        # Moves the hole up instead of swapping, so each level costs one write.
+        heap, keys, pos = self._heap, self._keys, self._pos
+        i = heap[j]
+        key = keys[i]
+        while j > 0:
+            p = (j - 1) >> 1
+            parent = heap[p]
+            if keys[parent] <= key:
+                break
+            heap[j] = parent
+            pos[parent] = j
+            j = p
+        heap[j] = i
+        pos[i] = j
+
+    def _sift_down(self, j: int) -> None:
+        heap, keys, pos, n = self._heap, self._keys, self._pos, self._size
+        i = heap[j]
+        key = keys[i]
+        while True:
+            c = 2 * j + 1
+            if c >= n:
+                break
+            if c + 1 < n and keys[heap[c + 1]] < keys[heap[c]]:
+                c += 1
+            child = heap[c]
+            if key <= keys[child]:
+                break
+            heap[j] = child
+            pos[child] = j
+            j = c
+        heap[j] = i
+        pos[i] = j
+
+
+@dataclass
+class OpCounts:
+    add: int = 0
+    remove_min: int = 0
+    remove: int = 0
+    decrease_key: int = 0
+    noop_update_key: int = 0
+    increase_key: int = 0
+    # Comparisons between Elements made by the APQ.
+    comparisons: int = 0
+    # Exchanges of two Elements in the queue list, as made by _bubble_up and _bubble_down.
+    swaps: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class _CountedKey:
+    """A key that counts the Element comparisons made with it.
+
+    Element's generated ordering methods compare (key,) tuples, and a tuple
+    comparison first tests the keys for equality. So __eq__ is called exactly
+    once for each comparison of two different Elements.
+    """
+    __slots__ = ("key", "counts")
+
+    def __init__(self, key: int, counts: OpCounts) -> None:
+        self.key = key
+        self.counts = counts
+
+    def __repr__(self) -> str:
+        return repr(self.key)
+
+    def __eq__(self, other: _CountedKey) -> bool:
+        self.counts.comparisons += 1
+        return self.key == other.key
+
+    def __lt__(self, other: _CountedKey) -> bool:
+        return self.key < other.key
+
+    def __le__(self, other: _CountedKey) -> bool:
+        return self.key <= other.key
+
+    def __gt__(self, other: _CountedKey) -> bool:
+        return self.key > other.key
+
+    def __ge__(self, other: _CountedKey) -> bool:
+        return self.key >= other.key
+
+
+class _CountingList(list):
+    """A list that counts item assignments. Each swap assigns two items."""
+
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self.writes = 0
+
+    def __setitem__(self, i, value) -> None:
+        self.writes += 1
+        super().__setitem__(i, value)
+
+
+_instrumented_classes: dict[type, type] = {}
+
+
+def instrumented(apq_class: type) -> type:
+    """Returns (and caches) the counting subclass of apq_class. See APQ.instrumented."""
+    if apq_class in _instrumented_classes:
+        return _instrumented_classes[apq_class]
+
+    class InstrumentedAPQ(apq_class):
+        def __init__(self, *args, **kwargs) -> None:
+            super().__init__(*args, **kwargs)
+            self._counts = OpCounts()
+            self._queue = _CountingList(self._queue)
+
+        @property
+        def counts(self) -> OpCounts:
+            self._counts.swaps = self._queue.writes // 2
+            return self._counts
+
+        def _wrap(self, key: int):
+            return _CountedKey(key, self._counts) if self.compares_keys else key
+
+        def get_key(self, element: Element) -> int:
+            return element.key.key if self.compares_keys else element.key
+
+        def add(self, key: int, value: T) -> Element:
+            self._counts.add += 1
+            return super().add(self._wrap(key), value)
+
+        def remove_min(self) -> T:
+            self._counts.remove_min += 1
+            return super().remove_min()
+
+        def update_key(self, element: Element, key: int) -> None:
+            old_key = self.get_key(element)
+            if key < old_key:
+                self._counts.decrease_key += 1
+            elif key == old_key:
+                self._counts.noop_update_key += 1
+            else:
+                self._counts.increase_key += 1
+            super().update_key(element, self._wrap(key))
+
+        def remove(self, element: Element) -> tuple[int, T]:
+            self._counts.remove += 1
+            key, value = super().remove(element)
+            return (key.key if self.compares_keys else key), value
+
+    InstrumentedAPQ.__name__ = InstrumentedAPQ.__qualname__ = f"Instrumented{apq_class.__name__}"
+    _instrumented_classes[apq_class] = InstrumentedAPQ
+    return InstrumentedAPQ
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import gc
+import math
+import statistics
+import timeit
+from dataclasses import asdict, dataclass
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class TimingStats:
+    """Summary of repeated timings. All times are seconds per call."""
+    min: float
+    median: float
+    p95: float
+    mean: float
+    stddev: float
+    repeat: int
+    number: int
+
+    @classmethod
+    def from_samples(cls, samples: list[float], number: int = 1) -> TimingStats:
+        """Summarises samples, each the total time taken by number calls.
+
+        Args:
+            samples (list[float]): One total time per repeat.
+            number (int, optional): The calls timed by each sample.
+
+        Returns:
+            TimingStats: The statistics.
+        """
+        if not samples:
+            raise ValueError("Cannot summarise zero samples")
+        per_call = sorted(s / number for s in samples)
+        return cls(min=per_call[0],
+                   median=statistics.median(per_call),
+                   p95=percentile(per_call, 95),
+                   mean=statistics.fmean(per_call),
+                   stddev=statistics.stdev(per_call) if len(per_call) > 1 else 0.,
+                   repeat=len(per_call),
+                   number=number)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> TimingStats:
+        return cls(**d)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def percentile(sorted_samples: list[float], q: float) -> float:
+    """Returns the q-th percentile of sorted samples, interpolating between neighbours."""
+    position = (len(sorted_samples) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    fraction = position - lower
+    return sorted_samples[lower] * (1 - fraction) + sorted_samples[upper] * fraction
+
+
+def measure(func: Callable[[], object], number: int = 1, repeat: int = 5,
+            disable_gc: bool = True, warmup: int = 1) -> TimingStats:
+    """Times func with timeit.repeat and summarises the spread.
+
+    Args:
+        func (Callable[[], object]): The function to time.
+        number (int, optional): Calls per sample.
+        repeat (int, optional): Number of samples.
+        disable_gc (bool, optional): Whether to keep the garbage collector off
+            while timing, as timeit does by default. If False, collection pauses
+            are included in the samples.
+        warmup (int, optional): Untimed calls made first.
+
+    Returns:
+        TimingStats: The statistics.
+    """
+    for _ in range(warmup):
+        func()
+    setup = "pass" if disable_gc else gc.enable
+    samples = timeit.repeat(func, setup=setup, number=number, repeat=repeat)
+    return TimingStats.from_samples(samples, number)
@@ -0,0 +1,60 @@
+from src.csr import CSRGraph
+from src.graph import Vertex, Edge, Graph
+
+import pytest
+
+
+def test_csr_from_edges():
+    g = CSRGraph.from_edges(4, [(0, 1, 2), (1, 2, 3), (0, 2, 5)])
+
+    assert g.num_vertices() == 4
+    assert g.num_edges() == 3
+
+    assert g.degree(0) == 2
+    assert g.degree(3) == 0
+
+    assert sorted(g.neighbours(2)) == [(0, 5.0), (1, 3.0)]
+    assert list(g.neighbours(3)) == []
+
+    assert sorted(g.edges()) == [(0, 1, 2.0), (0, 2, 5.0), (1, 2, 3.0)]
+
+    assert g.label(3) == "3"
+
+    with pytest.raises(AttributeError):
+        g.extra = 5
+
+    with pytest.raises(ValueError):
+        CSRGraph.from_edges(2, [(0, 2, 1)])
+
+
+def test_csr_from_graph():
+    v1 = Vertex("A")
+    v2 = Vertex("B")
+    v3 = Vertex("C")
+
+    g = Graph()
+
+    g.add_vertex(v1)
+    g.add_vertex(v2)
+    g.add_vertex(v3)
+
+    g.add_edge(v1, v2, Edge(v1, v2, "AB", 2))
+    g.add_edge(v2, v3, Edge(v2, v3, "BC", 4))
+
+    c = CSRGraph.from_graph(g)
+
+    assert c.num_vertices() == 3
+    assert c.num_edges() == 2
+
+    assert [c.label(v) for v in c.vertices] == ["A", "B", "C"]
+    assert sorted(c.neighbours(1)) == [(0, 2.0), (2, 4.0)]
+
+
+def test_csr_pickle():
+    import pickle
+
+    g = CSRGraph.from_edges(3, [(0, 1, 1.), (1, 2, 2.)], ["a", "b", "c"])
+    h = pickle.loads(pickle.dumps(g))
+
+    assert sorted(h.edges()) == sorted(g.edges())
+    assert list(h.labels) == ["a", "b", "c"]
@@ -0,0 +1,79 @@
+from src.edge_list import read_delimited, read_binary, write_binary, load_csr, LabelInterner, EdgeListError
+
+import pytest
+
+
+def test_read_delimited(tmp_path):
+    path = tmp_path / "edges.csv"
+    path.write_text("u,v,w\n# a comment\na,b,2\n\nb, c\nc,a,0.5\n")
+
+    chunks = list(read_delimited(path, chunk_size=2, skip_header=True))
+
+    assert chunks == [[("a", "b", 2.), ("b", "c", 1.)], [("c", "a", .5)]]
+
+    path.write_text("a,b,1,2\n")
+    with pytest.raises(EdgeListError):
+        list(read_delimited(path))
+
+
+def test_read_delimited_errors(tmp_path):
+    path = tmp_path / "edges.csv"
+
+    path.write_text("# a comment\n\na,b,1\n# another\na,b,1,2\n")
+    with pytest.raises(EdgeListError, match="Line 5 "):
+        list(read_delimited(path))
+
+    for weight in ["", "x"]:
+        path.write_text(f"a,b,1\n\nb,c,{weight}\n")
+        with pytest.raises(EdgeListError, match="Line 3 .* not a number"):
+            list(read_delimited(path))
+
+
+def test_label_interner():
+    interner = LabelInterner()
+
+    assert interner.intern("x") == 0
+    assert interner.intern("y") == 1
+    assert interner.intern("x") == 0
+
+    chunks = list(interner.intern_chunks([[("y", "z", 1.)], [("z", "x", 2.)]]))
+
+    assert [tuple(map(list, c)) for c in chunks] == [([1], [2], [1.]), ([2], [0], [2.])]
+    assert interner.labels == ["x", "y", "z"]
+    assert len(interner) == 3
+
+
+def test_binary_round_trip(tmp_path):
+    path = tmp_path / "edges.bin"
+    edges = [(0, 1, 2.5), (1, 2, 3.), (2, 0, 1.), (3, 4, 7.)]
+
+    write_binary(path, edges)
+
+    chunks = list(read_binary(path, chunk_size=3))
+
+    assert [len(us) for us, _, _ in chunks] == [3, 1]
+    assert [e for us, vs, ws in chunks for e in zip(us, vs, ws)] == edges
+
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(EdgeListError):
+        list(read_binary(path))
+
+
+def test_load_csr(tmp_path):
+    path = tmp_path / "edges.tsv"
+    path.write_text("a\tb\t2\nb\tc\t3\nd\ta\t1\n")
+
+    g = load_csr(path, chunk_size=2)
+
+    assert g.num_vertices() == 4
+    assert g.num_edges() == 3
+    assert [g.label(v) for v in g.vertices] == ["a", "b", "c", "d"]
+    assert sorted(g.edges()) == [(0, 1, 2.), (0, 3, 1.), (1, 2, 3.)]
+
+    path = tmp_path / "edges.bin"
+    write_binary(path, [(0, 5, 1.), (5, 2, 4.)])
+
+    g = load_csr(path)
+
+    assert g.num_vertices() == 6
+    assert sorted(g.edges()) == [(0, 5, 1.), (2, 5, 4.)]
@@ -0,0 +1,48 @@
+import random
+
+from src.generators import random_edges, random_csr
+from src.mst import UnionFind
+
+import pytest
+
+
+@pytest.mark.parametrize("n, m", [(1, 0), (2, 1), (10, 9), (10, 20), (10, 40), (10, 45), (50, 1000)])
+def test_random_edges(n, m):
+    edges = random_edges(n, m, random.Random(0))
+
+    assert len(edges) == m
+    assert len(set(edges)) == m
+    assert all(0 <= v < u < n for u, v in edges)
+
+    uf = UnionFind(n)
+    for u, v in edges[:n - 1]:
+        assert uf.union(u, v)
+    assert uf.components() == 1
+
+    assert random_edges(n, m, random.Random(0)) == edges
+
+
+def test_random_edges_too_many():
+    with pytest.raises(ValueError):
+        random_edges(4, 7)
+
+
+@pytest.mark.parametrize("n, m", [(1, 0), (2, 1), (10, 9), (10, 20), (10, 45), (50, 1000)])
+def test_random_csr(n, m):
+    pytest.importorskip("numpy")
+
+    g = random_csr(n, m, seed=0)
+
+    assert g.num_vertices() == n
+    assert g.num_edges() == m
+
+    edges = list(g.edges())
+    assert len({(u, v) for u, v, _ in edges}) == m
+    assert all(1 <= w <= 20 for _, _, w in edges)
+
+    uf = UnionFind(n)
+    for u, v, _ in edges:
+        uf.union(u, v)
+    assert uf.components() == 1
+
+    assert list(random_csr(n, m, seed=0).edges()) == edges
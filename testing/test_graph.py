@@ -1,4 +1,6 @@
-from src.graph import Vertex, Edge, Graph
+from src.graph import Vertex, Edge, Graph, DoesNotExistError
+
+import pytest
 
 
 def test_vertex():
@@ -72,3 +74,190 @@ def test_graph():
     assert g.num_vertices() == 2
 
     assert g.num_edges() == 0
+
+
+def test_ids():
+    a, b, c = Vertex("A"), Vertex("B"), Vertex("C")
+
+    g = Graph()
+    for v in (a, b, c):
+        g.add_vertex(v)
+
+    assert [g.vertex_id(v) for v in (a, b, c)] == g.vertex_ids() == [0, 1, 2]
+    assert g.vertex(1) is b
+    assert g.id_bound() == 3
+
+    # Equal vertex objects that are not the ones in the graph have their ids.
+    e = Edge(Vertex("C"), Vertex("A"), "CA", 1)
+    g.add_edge(c, a, e)
+
+    assert g.vertex_id(e.vertex_1) == 2
+    assert list(g.adjacency(0)) == [(2, e)]
+    assert hash(e) == hash(Edge(a, c, "CA", 7))
+
+    g.remove_vertex(b)
+
+    assert g.vertex_ids() == [0, 2]
+    assert g.id_bound() == 3
+    with pytest.raises(DoesNotExistError):
+        g.vertex(1)
+
+
+def test_shared_vertices():
+    g = Graph.from_edge_list(4, [(0, 1, 1), (1, 2, 2), (2, 3, 3), (3, 0, 4)])
+    a, b, c, d = g.vertices
+
+    # Ids belong to each graph, so building another graph from some of the
+    # same vertices leaves g as it was.
+    h = Graph.from_edge_list([d, b], [(0, 1, 5)])
+    h.add_vertex(a)
+
+    assert g.vertex_ids() == [0, 1, 2, 3]
+    assert [h.vertex_id(x) for x in (d, b, a)] == [0, 1, 2]
+    assert sorted(j for j, _ in g.adjacency(g.vertex_id(d))) == [0, 2]
+    assert g.neighbours(b) == [(a, g.get_edge(a, b)), (c, g.get_edge(b, c))]
+
+
+def test_pickle():
+    import pickle
+
+    a, b = Vertex("A"), Vertex("B")
+    e = pickle.loads(pickle.dumps(Edge(a, b, "AB", 2)))
+
+    assert e == Edge(b, a, "AB", 2)
+    assert hash(e) == hash(Edge(b, a, "AB", 2))
+    assert e.weight == 2
+
+
+def test_fingerprint():
+    a, b, c = Vertex("A"), Vertex("B"), Vertex("C")
+
+    g = Graph()
+    for v in (a, b, c):
+        g.add_vertex(v)
+    empty = g.fingerprint
+
+    g.add_edge(a, b, Edge(a, b, "AB", 1))
+    g.add_edge(b, c, Edge(b, c, "BC", 2))
+
+    h = Graph()
+    for v in (c, b, a):
+        h.add_vertex(v)
+    h.add_edge(c, b, Edge(c, b, "BC", 2))
+    h.add_edge(b, a, Edge(b, a, "AB", 3))
+
+    assert g.fingerprint != h.fingerprint
+
+    # Replacing an edge takes the old one out of the fingerprint.
+    h.add_edge(a, b, Edge(a, b, "AB", 1))
+
+    assert g.fingerprint == h.fingerprint
+    assert h.num_edges() == 2
+
+    g.remove_edge(g.get_edge(a, b))
+    g.remove_vertex(c)
+    g.add_vertex(c)
+
+    assert g.fingerprint == empty
+    assert g.degree(b) == 0
+
+
+def test_bulk_construction():
+    g = Graph.from_edge_list(4, [(0, 1, 2), (1, 2, 3), (2, 0, 1)])
+
+    a, b, c, d = g.vertices
+
+    assert [v.label for v in g.vertices] == ["0", "1", "2", "3"]
+    assert g.num_edges() == 3
+    assert g.get_edge(c, a).label == "2-0"
+    assert g.get_edges(b) == [g.get_edge(a, b), g.get_edge(b, c)]
+
+    h = Graph()
+    h.add_vertices([a, b, c, d])
+    for e in g.edges:
+        h.add_edge(e.vertex_1, e.vertex_2, e)
+
+    assert h.fingerprint == g.fingerprint
+
+    # Equal but distinct endpoints are the graph's vertices, and replacing an
+    # existing edge behaves as in add_edge.
+    g.add_edges([Edge(Vertex("3"), Vertex("0"), "3-0", 4), Edge(b, a, "1-0", 7)])
+
+    assert g.num_edges() == 4
+    assert g.get_edge(a, b).weight == 7
+    assert g.get_edge(a, d).vertex_1 is not d
+    assert list(g.adjacency(g.vertex_id(d))) == [(0, g.get_edge(a, d))]
+    assert len(g.get_edges(a)) == 3
+
+
+def test_from_edge_list_numpy():
+    np = pytest.importorskip("numpy")
+
+    g = Graph.from_edge_list(3, np.array([[0, 1, 1.5], [1, 2, 2.5]]))
+
+    assert sorted(e.weight for e in g.edges) == [1.5, 2.5]
+
+
+def test_copy_and_subgraph():
+    g = Graph.from_edge_list(4, [(0, 1, 1), (1, 2, 2), (2, 3, 3), (3, 0, 4), (0, 2, 5)])
+    a, b, c, d = g.vertices
+
+    h = g.copy()
+    h.remove_vertex(d)
+
+    assert g.num_vertices() == 4 and g.num_edges() == 5
+    assert h.num_edges() == 3
+    assert h.get_edge(a, b) is g.get_edge(a, b)
+
+    s = g.subgraph([a, c, d])
+
+    assert s.vertices == [a, c, d]
+    assert sorted(e.label for e in s.edges) == ["0-2", "2-3", "3-0"]
+    assert s.degree(a) == 2
+    assert [s.vertex_id(x) for x in (a, c, d)] == [0, 1, 2]
+    assert s.id_bound() == 3
+    assert g.vertex_ids() == [0, 1, 2, 3]
+
+    t = Graph.from_edge_list([a, c, d], [(0, 1, 5), (1, 2, 3), (2, 0, 4)])
+
+    assert s.fingerprint == t.fingerprint
+
+
+def test_copy_and_subgraph_independent():
+    g = Graph.from_edge_list(4, [(0, 1, 1), (1, 2, 2), (2, 3, 3), (3, 0, 4)])
+    a, b, c, d = g.vertices
+    fingerprint = g.fingerprint
+
+    h = g.copy()
+    h.remove_vertex(a)
+    h.add_vertex(a)
+    h.add_edge(a, c, Edge(a, c, "0-2", 9))
+    s = g.subgraph([c, d])
+    s.add_vertex(Vertex("4"))
+    s.add_vertex(b)
+    Graph.from_edge_list([d, c, b, a], [(0, 3, 1)])
+
+    assert g.vertex_ids() == [0, 1, 2, 3]
+    assert h.vertex_ids() == [1, 2, 3, 4]
+    assert [s.vertex_id(x) for x in (c, d, b)] == [0, 1, 3]
+    assert g.fingerprint == fingerprint
+    assert [sorted(j for j, _ in g.adjacency(i)) for i in range(4)] == [[1, 3], [0, 2], [1, 3], [0, 2]]
+
+
+def test_sorted_adjacency():
+    g = Graph.from_edge_list(4, [(0, 1, 3), (0, 2, 1), (0, 3, 2), (1, 2, 5)])
+    a, b, c, d = g.vertices
+
+    assert dict(g.neighbours(a)) == {y: g.get_edge(a, y) for y in (b, c, d)}
+    assert [(w, j) for w, j, _ in g.sorted_adjacency(0)] == [(1, 2), (2, 3), (3, 1)]
+    assert g.sorted_adjacency(0) is g.sorted_adjacency(0)
+
+    g.add_edge(a, b, Edge(a, b, "0-1", 0))
+    assert [j for _, j, _ in g.sorted_adjacency(0)] == [1, 2, 3]
+    assert [w for w, _, _ in g.sorted_adjacency(1)] == [0, 5]
+
+    g.remove_edge(g.get_edge(a, c))
+    assert [j for _, j, _ in g.sorted_adjacency(0)] == [1, 3]
+
+    g.remove_vertex(d)
+    assert [j for _, j, _ in g.sorted_adjacency(0)] == [1]
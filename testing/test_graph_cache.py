@@ -0,0 +1,52 @@
+import os
+
+from src.csr import CSRGraph
+from src.graph_cache import GraphCache
+
+
+def path_graph(n: int, m: int, seed: int) -> CSRGraph:
+    return CSRGraph.from_edges(n, [(i, i + 1, seed) for i in range(m)])
+
+
+def test_graph_cache(tmp_path):
+    cache = GraphCache(tmp_path)
+
+    assert cache.get(5, 4, 1) is None
+
+    g = cache.get_or_create(5, 4, 1, path_graph)
+
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    h = cache.get_or_create(5, 4, 1, path_graph)
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert sorted(h.edges()) == sorted(g.edges())
+
+    assert cache.get(5, 4, 2) is None
+
+    cache.clear()
+
+    assert cache.get(5, 4, 1) is None
+    assert cache.size() == 0
+
+
+def test_graph_cache_eviction(tmp_path):
+    cache = GraphCache(tmp_path)
+
+    cache.put(10, 9, 0, path_graph(10, 9, 0))
+    one = cache.size()
+    cache.max_bytes = 2 * one
+
+    cache.put(10, 9, 1, path_graph(10, 9, 1))
+    os.utime(cache.path(10, 9, 0), (0, 0))
+    os.utime(cache.path(10, 9, 1), (1, 1))
+
+    # Reading the first graph makes the second the least recently used.
+    assert cache.get(10, 9, 0) is not None
+
+    cache.put(10, 9, 2, path_graph(10, 9, 2))
+
+    assert cache.size() <= 2 * one
+    assert cache.path(10, 9, 0).exists()
+    assert not cache.path(10, 9, 1).exists()
+    assert cache.path(10, 9, 2).exists()
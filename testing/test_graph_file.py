@@ -0,0 +1,97 @@
+import struct
+
+from src.csr import CSRGraph
+from src.graph import Vertex, Edge, Graph
+from src.graph_file import write_csr, read_csr, save_graph, load_graph, GraphFileError, HEADER
+
+import pytest
+
+
+def test_graph_file_round_trip(tmp_path):
+    g = CSRGraph.from_edges(5, [(0, 1, 2.5), (1, 2, 3), (0, 2, 5), (3, 4, 1)], ["a", "b", "ç", "d", ""])
+
+    path = tmp_path / "g.csr"
+    write_csr(g, path)
+
+    h = read_csr(path)
+
+    assert isinstance(h.targets, memoryview)
+
+    assert h.num_vertices() == 5
+    assert h.num_edges() == 4
+    assert list(h.offsets) == list(g.offsets)
+    assert sorted(h.edges()) == sorted(g.edges())
+    assert sorted(h.neighbours(0)) == [(1, 2.5), (2, 5.0)]
+    assert list(h.labels) == ["a", "b", "ç", "d", ""]
+    assert h.label(-1) == ""
+
+
+def test_graph_file_unlabelled(tmp_path):
+    path = tmp_path / "g.csr"
+    write_csr(CSRGraph.from_edges(3, [(0, 1, 1), (1, 2, 2)]), path)
+
+    assert read_csr(path).labels is None
+
+    # Version 1 files have the same layout without labels.
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<I", data, 8, 1)
+    path.write_bytes(data)
+
+    assert sorted(read_csr(path).edges()) == [(0, 1, 1.), (1, 2, 2.)]
+
+
+def test_graph_file_numpy_views(tmp_path):
+    np = pytest.importorskip("numpy")
+
+    path = tmp_path / "g.csr"
+    write_csr(CSRGraph.from_edges(3, [(0, 1, 1), (1, 2, 2)]), path)
+
+    g = read_csr(path)
+    offsets, targets, weights = g.to_numpy()
+
+    assert offsets.tolist() == [0, 1, 3, 4]
+    assert targets.tolist() == [1, 0, 2, 1]
+    assert weights.tolist() == [1., 1., 2., 2.]
+    assert not weights.flags.writeable
+    assert np.shares_memory(weights, np.frombuffer(g.weights, dtype=weights.dtype))
+
+
+def test_graph_round_trip(tmp_path):
+    a, b, c = Vertex("A"), Vertex("B"), Vertex("C")
+
+    g = Graph()
+    for v in (a, b, c):
+        g.add_vertex(v)
+    g.add_edge(a, b, Edge(a, b, "AB", 2))
+    g.add_edge(b, c, Edge(b, c, "BC", 4))
+
+    path = tmp_path / "g.csr"
+    save_graph(g, path)
+
+    h = load_graph(path)
+
+    assert h.vertices == [a, b, c]
+    assert h.get_edge(a, b).weight == 2
+    assert h.get_edge(c, b).weight == 4
+    assert h.num_edges() == 2
+
+
+def test_graph_file_errors(tmp_path):
+    path = tmp_path / "g.csr"
+
+    path.write_bytes(b"CSR")
+    with pytest.raises(GraphFileError):
+        read_csr(path)
+
+    path.write_bytes(b"NOTAGRAPH" * 10)
+    with pytest.raises(GraphFileError):
+        read_csr(path)
+
+    path.write_bytes(HEADER.pack(b"CSRGRAPH", 99, 0, 0, 0) + bytes(8))
+    with pytest.raises(GraphFileError):
+        read_csr(path)
+
+    write_csr(CSRGraph.from_edges(3, [(0, 1, 1), (1, 2, 1)]), path)
+    path.write_bytes(path.read_bytes()[:-8])
+    with pytest.raises(GraphFileError):
+        read_csr(path)
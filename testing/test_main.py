@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+
+# main is run from src and imports its siblings as top-level modules.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+import main
+from csr import CSRGraph
+from graph import Graph
+from graph_cache import GraphCache
+from mst import UnionFind, kruskal
+from priority_queue import BucketAPQ, HeapAPQ, OpCounts
+from timing import TimingStats
+
+import pytest
+
+
+def _times(medians: dict) -> dict:
+    # {name: {n: {ratio: seconds}}} to the TimingStats layout of time_functions.
+    return {name: {n: {ratio: TimingStats.from_samples([t]) for ratio, t in row.items()} for n, row in t.items()}
+            for name, t in medians.items()}
+
+
+def _components_graph(sizes: list[int], rng: random.Random) -> Graph:
+    # A graph with one connected component per size, in consecutive vertices,
+    # and distinct weights so that every minimum spanning forest is the same.
+    edges, start = [], 0
+    for size in sizes:
+        vertices = list(range(start, start + size))
+        rng.shuffle(vertices)
+        edges += [(vertices[i], vertices[rng.randrange(i)]) for i in range(1, size)]
+        edges += [tuple(rng.sample(vertices, 2)) for _ in range(size if size > 2 else 0)]
+        start += size
+    edges = list({frozenset(e): e for e in edges}.values())
+    weights = rng.sample(range(1, 10 * len(edges) + 1), len(edges))
+    return Graph.from_edge_list(start, [(u, v, w) for (u, v), w in zip(edges, weights)])
+
+
+def _id_pairs(g: Graph, edges: list) -> set:
+    return {frozenset((g.vertex_id(e.vertex_1), g.vertex_id(e.vertex_2))) for e in edges}
+
+
+def _test_graphs() -> list[Graph]:
+    rng = random.Random(1)
+    graphs = [main.create_graph(n, int(ratio * n * (n - 1) / 2), rng)
+              for n, ratio in ((1, 0.), (2, 1.), (30, 0.1), (30, 1.), (80, 0.3))]
+    return graphs + [_components_graph([rng.randint(1, 15) for _ in range(4)], rng) for _ in range(4)]
+
+
+def _triples(g: Graph, edges: list) -> list[tuple[int, int, float]]:
+    return [(g.vertex_id(e.vertex_1), g.vertex_id(e.vertex_2), e.weight) for e in edges]
+
+
+def _assert_minimum_forest(g: Graph, tree: list[tuple[int, int, float]]) -> None:
+    # tree holds (u, v, weight) triples of vertex ids in g.
+    expected = kruskal(g)
+    uf = UnionFind(g.id_bound())
+    for u, v, w in tree:
+        assert g.get_edge(g.vertex(u), g.vertex(v)).weight == w
+        assert uf.union(u, v)
+    assert len(tree) == len(expected)
+    assert sum(w for _, _, w in tree) == sum(e.weight for e in expected)
+
+
+def test_build_calibration():
+    times = _times({"prim_heap": {10: {0.5: 2., 1.0: 1.}},
+                    "kruskal": {10: {0.5: 1., 1.0: 3.}},
+                    "prim_dense": {10: {0.5: 0.1, 1.0: 0.1}}})
+
+    # prim_dense is faster but not dispatchable.
+    assert main.build_calibration(times) == {10: {0.5: "kruskal", 1.0: "prim_heap"}}
+
+
+def test_load_calibration():
+    f = io.StringIO()
+    main.dump_calibration({10: {0.5: "kruskal"}}, f)
+    f.seek(0)
+
+    assert main.load_calibration(f) == {10: {0.5: "kruskal"}}
+
+    with pytest.raises(ValueError):
+        main.load_calibration(io.StringIO('{"version": 0, "table": {}}'))
+
+
+def test_select_algorithm():
+    table = {100: {0.1: "kruskal", 1.0: "prim_heap"}, 1000: {0.1: "boruvka"}}
+
+    assert main.select_algorithm(120, 4000, table) == "prim_heap"
+    assert main.select_algorithm(120, 100, table) == "kruskal"
+    assert main.select_algorithm(800, 100, table) == "boruvka"
+    assert main.select_algorithm(1, 0, table) == "kruskal"
+    assert main.select_algorithm(100, 100, {}) == main.DEFAULT_ALGORITHM
+
+
+def test_mst():
+    g = Graph.from_edge_list(4, [(0, 1, 3), (1, 2, 1), (2, 3, 2), (3, 0, 1), (0, 2, 5)])
+
+    for name in ("kruskal", "prim_heap", "prim_sorted_heap"):
+        tree = main.mst(g, {4: {0.5: name}})
+
+        assert len(tree) == 3
+        assert sum(e.weight for e in tree) == 4
+
+    # mst keeps the sorted adjacency that prim_sorted_heap built for later calls
+    entries = g.sorted_adjacency(0)
+    main.mst(g, {4: {0.5: "prim_sorted_heap"}})
+
+    assert g.sorted_adjacency(0) is entries
+
+
+def test_time_cell_reset(monkeypatch):
+    resets = []
+    algorithm = main.Algorithm("Reset", main.prim_sorted_heap, reset=lambda g: resets.append(g))
+    monkeypatch.setitem(main.ALGORITHMS, "reset", algorithm)
+
+    times, _ = main._time_cell(10, 0.5, 2, ["reset"], seed=1, repeat=3)
+
+    # One warm-up call, then 3 samples of 2 calls
+    assert len(resets) == 7
+    assert times["reset"].median > 0
+
+
+def test_update_calibration(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "_calibration", None)
+
+    def sweep(n, winner):
+        return _times({name: {n: {0.5: 1. if name == winner else 2.}} for name in main.DISPATCHABLE})
+
+    main.update_calibration(sweep(10, "kruskal"))
+    main.update_calibration(sweep(20, "boruvka"))
+    main.update_calibration(sweep(10, "prim_heap"))
+
+    def table():
+        with open(main.CALIBRATION_FILE) as f:
+            return main.load_calibration(f)
+
+    assert table() == {10: {0.5: "prim_heap"}, 20: {0.5: "boruvka"}}
+
+    # Sweeps that leave out a dispatchable algorithm do not change the table.
+    main.update_calibration(_times({"prim_dense": {30: {0.5: 1.}}}))
+    main.update_calibration(_times({"kruskal": {20: {0.5: 1.}}}))
+
+    assert table() == {10: {0.5: "prim_heap"}, 20: {0.5: "boruvka"}}
+    assert main.select_algorithm(20, 95) == "boruvka"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_minimum_spanning_forest(seed):
+    rng = random.Random(seed)
+    sizes = [rng.randint(1, 12) for _ in range(5)]
+    g = _components_graph(sizes, rng)
+    expected = _id_pairs(g, kruskal(g))
+
+    forest = main.minimum_spanning_forest(g)
+
+    assert len(forest) == len(sizes)
+    assert [len(t.edges) for t in forest] == [size - 1 for size in sizes]
+    assert set().union(*(_id_pairs(g, t.edges) for t in forest)) == expected
+    for t in forest:
+        assert t.weight == sum(e.weight for e in t.edges)
+
+    c = CSRGraph.from_graph(g)
+    csr_forest = main.minimum_spanning_forest(c, HeapAPQ())
+
+    assert [t.root for t in csr_forest] == [g.vertex_id(t.root) for t in forest]
+    assert [t.weight for t in csr_forest] == [t.weight for t in forest]
+    assert [{frozenset((u, v)) for u, v, _ in t.edges} for t in csr_forest] == \
+        [_id_pairs(g, t.edges) for t in forest]
+
+
+def test_prim_root():
+    rng = random.Random(7)
+    g = _components_graph([6, 4, 1, 9], rng)
+    c = CSRGraph.from_graph(g)
+    expected = _id_pairs(g, kruskal(g))
+
+    for root, component in ((0, range(0, 6)), (8, range(6, 10)), (10, [10]), (15, range(11, 20))):
+        tree = main.prim(g, HeapAPQ(), g.vertex(root))
+        pairs = _id_pairs(g, tree)
+
+        assert len(tree) == len(component) - 1
+        assert pairs == {p for p in expected if set(p) <= set(component)}
+        assert {frozenset((u, v)) for u, v, _ in main.prim(c, HeapAPQ(), root)} == pairs
+
+        # Only the root's component is ever queued.
+        apq = HeapAPQ.instrumented()()
+        main.prim(g, apq, g.vertex(root))
+
+        assert apq.counts.add == len(component)
+
+
+def test_prim_csr():
+    for g in _test_graphs():
+        c = CSRGraph.from_graph(g)
+
+        _assert_minimum_forest(g, main.prim_csr(c, HeapAPQ()))
+        _assert_minimum_forest(g, main.prim_heap(c))
+
+
+def test_prim_dense():
+    for g in _test_graphs():
+        _assert_minimum_forest(g, _triples(g, main.prim_dense(*main.adjacency_matrix(g))))
+
+
+def test_prim_lazy_heap():
+    for g in _test_graphs():
+        _assert_minimum_forest(g, _triples(g, main.prim_lazy_heap(g)))
+
+
+def test_prim_indexed():
+    for g in _test_graphs():
+        _assert_minimum_forest(g, main.prim_indexed(CSRGraph.from_graph(g)))
+
+
+def test_time_functions_cache(tmp_path):
+    cache = GraphCache(tmp_path)
+    for _ in range(2):
+        main.time_functions([0.5], [10, 20], iterations=1, algorithms=["prim_heap"], cache=cache, repeat=1)
+
+    # Without a seed, the second run finds the graphs of the first.
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_iterations_default():
+    assert main.parse_command_line_arguments([]).iterations == 100
+    assert main.parse_command_line_arguments(["euclidean"]).iterations == 1
+    assert main.parse_command_line_arguments(["euclidean", "--iterations", "3"]).iterations == 3
+
+
+def test_sweep():
+    assert main._sweep(int)("5") == [5]
+    assert main._sweep(int)("10:30:10") == [10, 20, 30]
+    assert main._sweep(int)("10:10:5") == [10]
+    assert main._sweep(float)("0.1:0.3:0.1") == [0.1, 0.2, 0.3]
+
+    for text in ("10:5:1", "1:5:0", "1:5:-1", "a", "1:2"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            main._sweep(int)(text)
+
+
+def test_parse_command_line_arguments():
+    args = main.parse_command_line_arguments(
+        ["calibrate", "--ns", "10:30:10", "5000", "20", "--ratios", "0.5", "0.1:0.2:0.1", "--algorithms", "kruskal",
+         "--seed", "3", "--output", "a.csv", "--output", "b.npz", "--no-plots", "--enable-gc"])
+
+    assert args.command == "calibrate"
+    assert args.ns == [10, 20, 30, 5000]
+    assert args.ratios == [0.1, 0.2, 0.5]
+    assert (args.algorithms, args.seed, args.output) == (["kruskal"], 3, ["a.csv", "b.npz"])
+    assert not args.plots and not args.disable_gc
+    assert args.cache is None
+
+    args = main.parse_command_line_arguments([])
+
+    assert args.command == "benchmark"
+    assert args.algorithms is None and args.seed is None
+    assert args.plots and args.disable_gc
+
+    args = main.parse_command_line_arguments(["--iterations", "1", "--repeat", "1", "--workers", "2"])
+
+    assert (args.iterations, args.repeat, args.workers) == (1, 1, 2)
+
+    for argv in (["--ns", "1"], ["--ns", "10:5:1"], ["--ratios", "0"], ["--ratios", "1.5"],
+                 ["--output", "results.txt"], ["--algorithms", "nope"], ["--iterations", "0"],
+                 ["--repeat", "0"], ["--workers", "-1"], ["--cache-size", "-5"], ["--repeat", "x"]):
+        with pytest.raises(SystemExit):
+            main.parse_command_line_arguments(argv)
+
+
+def _results() -> tuple[dict, dict]:
+    times = _times({"prim_heap": {10: {0.5: 2.}, 20: {0.5: 3.}}, "kruskal": {10: {0.5: 1.}}})
+    counts = {"prim_heap": {10: {0.5: OpCounts(add=10, remove_min=10, comparisons=7)}}}
+    return times, counts
+
+
+def test_write_csv():
+    f = io.StringIO()
+    main.write_csv(*_results(), f)
+    f.seek(0)
+    rows = list(csv.DictReader(f))
+
+    assert [(r["algorithm"], r["n"], r["ratio"]) for r in rows] == \
+        [("prim_heap", "10", "0.5"), ("prim_heap", "20", "0.5"), ("kruskal", "10", "0.5")]
+    assert float(rows[1]["median"]) == 3.
+    assert (rows[0]["add"], rows[0]["comparisons"], rows[0]["swaps"]) == ("10", "7", "0")
+    assert rows[1]["add"] == ""
+
+
+def test_write_npz(tmp_path):
+    np = pytest.importorskip("numpy")
+    path = tmp_path / "results.npz"
+    main.write_results(*_results(), str(path))
+
+    data = np.load(path)
+
+    assert set(data.files) == set(main.RESULT_COLUMNS)
+    assert list(data["algorithm"]) == ["prim_heap", "prim_heap", "kruskal"]
+    assert list(data["n"]) == [10, 20, 10]
+    assert list(data["median"]) == [2., 3., 1.]
+    assert list(data["add"]) == [10, -1, -1]
+
+
+def test_load_times():
+    times, counts = _results()
+    f = io.StringIO()
+    main.dump_times(times, counts, f)
+    f.seek(0)
+
+    assert main.load_times(f) == (times, counts)
+
+    # Version 1 files hold one total time per cell, as a list of the heap and
+    # unsorted list tables or as a dict by algorithm.
+    legacy = '[{"10": {"0.5": 2.0}}, {"10": {"0.5": 4.0}}]'
+    times, counts = main.load_times(io.StringIO(legacy))
+
+    assert counts == {}
+    assert times == _times({"prim_heap": {10: {0.5: 2.}}, "prim_unsorted_list": {10: {0.5: 4.}}})
+
+    times, _ = main.load_times(io.StringIO('{"kruskal": {"20": {"1.0": 0.5}}}'))
+
+    assert times == _times({"kruskal": {20: {1.: 0.5}}})
+
+
+def test_instrumented_apq():
+    apq = main._instrumented_apq(main.ALGORITHMS["prim_bucket"].apq)
+
+    assert isinstance(apq, BucketAPQ) and apq.counts.add == 0
+    assert apq.max_key == main.MAX_WEIGHT
+    assert main._instrumented_apq(main.ALGORITHMS["prim_dary_heap"].apq).d == 4
+
+    names = [name for name, algorithm in main.ALGORITHMS.items() if algorithm.apq is not None]
+    _, counts = main._time_cell(20, 0.5, 1, names, seed=0, repeat=1, count_ops=True)
+
+    assert sorted(counts) == sorted(names)
+    assert all(c.add == c.remove_min == 20 for c in counts.values())
@@ -0,0 +1,264 @@
+import asyncio
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.graph import Vertex, Edge, Graph
+from src.csr import CSRGraph
+from src.mst import BatchPrim, kruskal, boruvka, prim_batch, DynamicMST, euclidean_mst, MemoizedMST, MSTService, UnionFind, fingerprint
+
+import pytest
+
+
+def random_graph(rng: random.Random, n: int, m: int) -> Graph:
+    g = Graph()
+    vertices = [Vertex(str(i)) for i in range(n)]
+    for v in vertices:
+        g.add_vertex(v)
+
+    pairs = [(i, j) for i in range(n) for j in range(i + 1, n)]
+    for i, j in rng.sample(pairs, m):
+        w = rng.randint(1, 20)
+        g.add_edge(vertices[i], vertices[j], Edge(vertices[i], vertices[j], f"{i}-{j}", w))
+    return g
+
+
+def brute_force_weight(g: Graph) -> int:
+    # Minimum spanning forest weight by repeatedly merging labelled components.
+    comp = {v: v.label for v in g.vertices}
+    total = 0
+    for e in sorted(g.edges, key=lambda e: e.weight):
+        a, b = comp[e.vertex_1], comp[e.vertex_2]
+        if a != b:
+            total += e.weight
+            for v, c in comp.items():
+                if c == b:
+                    comp[v] = a
+    return total
+
+
+def test_union_find():
+    uf = UnionFind(5)
+
+    assert uf.components() == 5
+
+    assert uf.union(0, 1)
+    assert uf.union(3, 4)
+    assert not uf.union(1, 0)
+
+    assert uf.connected(0, 1)
+    assert not uf.connected(1, 3)
+
+    assert uf.union(1, 4)
+
+    assert uf.connected(0, 3)
+    assert uf.components() == 2
+
+
+def test_mst_small():
+    a, b, c, d = Vertex("A"), Vertex("B"), Vertex("C"), Vertex("D")
+    ab, bc, cd, ad, ac = Edge(a, b, "AB", 1), Edge(b, c, "BC", 4), Edge(c, d, "CD", 2), \
+        Edge(a, d, "AD", 3), Edge(a, c, "AC", 5)
+
+    g = Graph()
+    for v in (a, b, c, d):
+        g.add_vertex(v)
+    for e in (ab, bc, cd, ad, ac):
+        g.add_edge(e.vertex_1, e.vertex_2, e)
+
+    assert kruskal(g) == [ab, cd, ad]
+    assert set(boruvka(g)) == {ab, cd, ad}
+
+
+@pytest.mark.parametrize("algorithm", [kruskal, boruvka])
+def test_mst_random(algorithm):
+    rng = random.Random(0)
+
+    for _ in range(50):
+        n = rng.randint(1, 25)
+        m = rng.randint(0, n * (n - 1) // 2)
+        g = random_graph(rng, n, m)
+
+        tree = algorithm(g)
+
+        assert len(set(tree)) == len(tree)
+        assert sum(e.weight for e in tree) == brute_force_weight(g)
+
+        uf = UnionFind(n)
+        for e in tree:
+            assert uf.union(int(e.vertex_1.label), int(e.vertex_2.label))
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_prim_batch(workers):
+    rng = random.Random(2)
+
+    graphs = []
+    for _ in range(40):
+        n = rng.randint(1, 30)
+        graphs.append(random_graph(rng, n, rng.randint(0, n * (n - 1) // 2)))
+
+    # Ids of removed vertices are skipped.
+    isolated = Vertex("isolated")
+    graphs[0].add_vertex(isolated)
+    graphs[0].remove_vertex(isolated)
+
+    expected = [brute_force_weight(g) for g in graphs]
+    csr_graphs = [CSRGraph.from_graph(g) for g in graphs]
+
+    trees = list(prim_batch(iter(graphs), workers=workers, chunksize=3))
+    csr_trees = list(prim_batch(csr_graphs, workers=workers, chunksize=3))
+
+    assert [sum(e.weight for e in tree) for tree in trees] == expected
+    assert [sum(w for _, _, w in tree) for tree in csr_trees] == expected
+    assert [len(t) for t in trees] == [len(t) for t in csr_trees] == [len(kruskal(g)) for g in graphs]
+
+
+def test_dynamic_mst():
+    rng = random.Random(1)
+
+    n = 15
+    g = random_graph(rng, n, 30)
+    vertices = sorted(g.vertices, key=lambda v: int(v.label))
+
+    dynamic = DynamicMST(g)
+
+    assert dynamic.weight() == brute_force_weight(g)
+
+    for step in range(200):
+        if rng.random() < 0.5 and g.num_edges():
+            e = rng.choice(g.edges)
+            dynamic.remove_edge(e)
+        else:
+            i, j = rng.sample(range(n), 2)
+            x, y = vertices[i], vertices[j]
+            dynamic.add_edge(x, y, Edge(x, y, f"{i}-{j}-{step}", rng.randint(1, 20)))
+
+        tree = dynamic.edges
+        assert dynamic.weight() == brute_force_weight(g)
+        assert all(e in g.edges for e in tree)
+
+        uf = UnionFind(n)
+        for e in tree:
+            assert uf.union(int(e.vertex_1.label), int(e.vertex_2.label))
+
+    v = Vertex(str(n))
+    dynamic.add_vertex(v)
+    dynamic.add_edge(v, vertices[0], Edge(v, vertices[0], "new", 1))
+
+    assert dynamic.in_tree(g.get_edge(v, vertices[0]))
+
+    weight = dynamic.weight()
+    loop = Edge(v, v, "loop", 0)
+    dynamic.add_edge(v, v, loop)
+
+    assert not dynamic.in_tree(loop)
+    assert dynamic.weight() == weight
+
+    dynamic.remove_edge(loop)
+
+    assert dynamic.weight() == weight
+
+
+def test_fingerprint():
+    rng = random.Random(3)
+    g = random_graph(rng, 10, 20)
+
+    h = Graph()
+    for v in reversed(g.vertices):
+        h.add_vertex(v)
+    for e in reversed(g.edges):
+        h.add_edge(e.vertex_2, e.vertex_1, Edge(e.vertex_2, e.vertex_1, e.label, e.weight))
+
+    assert fingerprint(g) == fingerprint(h)
+    assert fingerprint(CSRGraph.from_graph(g)) == fingerprint(CSRGraph.from_graph(g))
+
+    e = h.edges[0]
+    h.remove_edge(e)
+    h.add_edge(e.vertex_1, e.vertex_2, Edge(e.vertex_1, e.vertex_2, e.label, e.weight + 1))
+
+    assert fingerprint(g) != fingerprint(h)
+
+
+def test_mst_service():
+    rng = random.Random(4)
+    graphs = [random_graph(rng, 12, 30) for _ in range(3)]
+    release = threading.Event()
+    calls = []
+
+    def engine(g):
+        calls.append(g)
+        release.wait()
+        return kruskal(g)
+
+    async def client():
+        async with MSTService(engine, executor=ThreadPoolExecutor(2), cache_size=2) as service:
+            first = asyncio.gather(*(service.solve(graphs[0]) for _ in range(5)), service.solve(graphs[1]))
+            await asyncio.sleep(0.01)
+            assert service.queue_depth() == 2
+            release.set()
+            trees = await first
+
+            assert all(tree == trees[0] for tree in trees[:5])
+            assert sum(e.weight for e in trees[5]) == brute_force_weight(graphs[1])
+
+            # graphs[1] is the least recently used when graphs[2] is cached.
+            await service.solve(graphs[0])
+            await service.solve(graphs[2])
+            await service.solve(graphs[1])
+            return service.metrics()
+
+    metrics = asyncio.run(client())
+
+    assert len(calls) == 4
+    assert metrics["requests"] == 9
+    assert metrics["coalesced"] == 4
+    assert metrics["hits"] == 1
+    assert metrics["computed"] == 4
+    assert metrics["max_queue_depth"] == 2
+    assert metrics["latency"]["repeat"] == 9
+
+
+def test_memoized_mst():
+    rng = random.Random(5)
+    g, h = random_graph(rng, 12, 30), random_graph(rng, 12, 30)
+
+    memo = MemoizedMST(BatchPrim().solve, max_size=1)
+    tree = memo(g)
+
+    assert memo(g) == tree
+    assert memo(CSRGraph.from_graph(g)) == memo(CSRGraph.from_graph(g))
+    assert (memo.hits, memo.misses) == (2, 2)
+
+    e = g.edges[0]
+    g.remove_edge(e)
+
+    assert sum(e.weight for e in memo(g)) == brute_force_weight(g)
+    assert sum(e.weight for e in memo(h)) == brute_force_weight(h)
+    assert (memo.hits, memo.misses, len(memo)) == (2, 4, 1)
+
+
+def test_euclidean_mst():
+    pytest.importorskip("numpy")
+    rng = random.Random(6)
+
+    for n, d in ((0, 2), (1, 2), (2, 1), (30, 2), (25, 3)):
+        points = [[rng.randint(0, 10) for _ in range(d)] for _ in range(n)]
+
+        g = Graph()
+        vertices = [Vertex(str(i)) for i in range(n)]
+        for v in vertices:
+            g.add_vertex(v)
+        for i in range(n):
+            for j in range(i + 1, n):
+                w = sum((a - b) ** 2 for a, b in zip(points[i], points[j])) ** 0.5
+                g.add_edge(vertices[i], vertices[j], Edge(vertices[i], vertices[j], f"{i}-{j}", w))
+
+        tree = euclidean_mst(points)
+
+        assert len(tree) == max(n - 1, 0)
+        assert sum(w for _, _, w in tree) == pytest.approx(sum(e.weight for e in kruskal(g)))
+
+        uf = UnionFind(n)
+        for u, v, _ in tree:
+            assert uf.union(u, v)
@@ -1,13 +1,32 @@
+import math
+import random
 import sys
+from functools import partial
 
-from src.priority_queue import HeapAPQ, UnsortedListAPQ, APQ, Element
+from src.priority_queue import HeapAPQ, UnsortedListAPQ, DaryHeapAPQ, PairingHeapAPQ, IndexedHeapAPQ, APQ, Element, \
+    OpCounts, BucketAPQ, RadixHeapAPQ
 
 import pytest
 
 py310 = sys.version_info.minor >= 10 or sys.version_info.major > 3
 
+APQ_CLASSES = [HeapAPQ, UnsortedListAPQ, DaryHeapAPQ,
+               partial(DaryHeapAPQ, d=3), PairingHeapAPQ, BucketAPQ, partial(BucketAPQ, max_key=50),
+               RadixHeapAPQ, partial(RadixHeapAPQ, max_key=50)]
 
-@pytest.mark.parametrize("apq_class", [HeapAPQ, UnsortedListAPQ])
+
+@pytest.mark.parametrize("apq_class", APQ_CLASSES)
+def test_empty_apq(apq_class: APQ):
+    apq: APQ = apq_class()
+
+    with pytest.raises(IndexError):
+        apq.min()
+
+    with pytest.raises(IndexError):
+        apq.remove_min()
+
+
+@pytest.mark.parametrize("apq_class", APQ_CLASSES)
 def test_apq(apq_class: APQ):
     apq: APQ = apq_class()
 
@@ -71,3 +90,184 @@ def test_element():
     if py310:
         with pytest.raises(AttributeError):
             e3.new_attr = 5
+
+
+@pytest.mark.parametrize("apq_class", APQ_CLASSES)
+def test_apq_order(apq_class: APQ):
+    apq: APQ = apq_class()
+
+    rng = random.Random(0)
+
+    keys = [rng.randint(0, 50) for _ in range(200)]
+    elements = [apq.add(k, i) for i, k in enumerate(keys)]
+
+    for i in range(0, 200, 3):
+        keys[i] = rng.randint(0, 50)
+        apq.update_key(elements[i], keys[i])
+
+    for i in range(1, 200, 7):
+        assert apq.remove(elements[i]) == (keys[i], i)
+        keys[i] = None
+
+    remaining = sorted(k for k in keys if k is not None)
+
+    assert apq.length() == len(remaining)
+    assert [keys[apq.remove_min()] for _ in remaining] == remaining
+
+
+def test_dary_heap_apq_arity():
+    with pytest.raises(ValueError):
+        DaryHeapAPQ(d=1)
+
+
+def test_indexed_heap_apq():
+    apq = IndexedHeapAPQ(12)
+
+    apq.heapify([9, 8, 7, 6, 5, 4, 3, 2, 1, 0], "abcdefghij")
+
+    assert apq.length() == 10
+
+    assert apq.min() == 9
+
+    assert apq.remove_min() == 9
+    assert 9 not in apq
+
+    apq.remove_min()
+    apq.remove_min()
+
+    assert apq.min() == 6
+
+    apq.add(10, 1, "k")
+
+    assert apq.min() == 10
+
+    assert apq.get_key(0) == 9
+
+    assert apq.remove(0) == (9, "a")
+
+    apq.update_key(10, 10)
+
+    assert apq.min() == 6
+
+    apq.update_key(10, 0)
+
+    assert apq.min() == 10
+
+    with pytest.raises(ValueError):
+        apq.add(10, 3)
+
+    with pytest.raises(IndexError):
+        apq.remove(0)
+
+    with pytest.raises(IndexError):
+        apq.update_key(0, 0)
+
+    with pytest.raises(ValueError):
+        apq.heapify([0] * 13)
+
+    # Updating an id that has left the queue must not touch the heap
+    apq.heapify([1, 2, 3])
+    apq.remove_min()
+    apq.add(0, 5)
+    apq.remove_min()
+
+    with pytest.raises(IndexError):
+        apq.update_key(1, .5)
+
+    assert apq.length() == 2
+    assert 0 in apq
+    assert [apq.remove_min(), apq.remove_min()] == [2, 0]
+
+    apq.heapify([])
+
+    with pytest.raises(IndexError):
+        apq.remove_min()
+
+
+def test_indexed_heap_apq_order():
+    rng = random.Random(0)
+
+    keys = [rng.randint(0, 50) for _ in range(200)]
+
+    apq = IndexedHeapAPQ(200)
+    apq.heapify(keys)
+
+    for i in range(0, 200, 3):
+        keys[i] = rng.randint(0, 50)
+        apq.update_key(i, keys[i])
+
+    for i in range(1, 200, 7):
+        assert apq.remove(i)[0] == keys[i]
+        keys[i] = None
+
+    remaining = sorted(k for k in keys if k is not None)
+
+    assert apq.length() == len(remaining)
+    assert [keys[apq.remove_min()] for _ in remaining] == remaining
+
+
+@pytest.mark.parametrize("apq_class", [HeapAPQ, UnsortedListAPQ, DaryHeapAPQ, PairingHeapAPQ, BucketAPQ, RadixHeapAPQ])
+def test_instrumented_apq(apq_class):
+    counting_class = apq_class.instrumented()
+
+    assert counting_class is apq_class.instrumented()
+    assert issubclass(counting_class, apq_class)
+    assert not hasattr(apq_class(), "counts")
+
+    apq = counting_class()
+
+    elements = [apq.add(k, k) for k in range(10, 0, -1)]
+
+    apq.update_key(elements[0], 0)
+    apq.update_key(elements[1], 9)
+    apq.update_key(elements[2], 11)
+
+    assert apq.get_key(elements[2]) == 11
+    assert apq.remove(elements[3]) == (7, 7)
+    assert [apq.remove_min() for _ in range(3)] == [10, 1, 2]
+
+    counts = apq.counts
+
+    assert (counts.add, counts.remove_min, counts.remove) == (10, 3, 1)
+    assert (counts.decrease_key, counts.noop_update_key, counts.increase_key) == (1, 1, 1)
+    if apq_class.compares_keys:
+        assert counts.comparisons > 0
+    else:
+        assert counts.comparisons == 0
+
+    if apq_class in (PairingHeapAPQ, BucketAPQ, RadixHeapAPQ):
+        assert counts.swaps == 0
+    else:
+        assert counts.swaps > 0
+
+    assert OpCounts(**counts.to_dict()) == counts
+
+
+@pytest.mark.parametrize("apq_class", [BucketAPQ, RadixHeapAPQ])
+def test_integer_apq(apq_class):
+    apq = apq_class(max_key=1000)
+
+    # Keys that drop below the last minimum removed, as in Prim's algorithm.
+    elements = [apq.add(math.inf, i) for i in range(6)]
+    apq.update_key(elements[0], 700)
+    apq.update_key(elements[1], 900)
+
+    assert apq.remove_min() == 0
+
+    apq.update_key(elements[2], 3)
+    apq.update_key(elements[3], 515)
+
+    assert apq.remove_min() == 2
+    assert apq.get_key(elements[4]) == math.inf
+
+    apq.update_key(elements[4], 1)
+    apq.update_key(elements[1], 2)
+
+    assert [apq.remove_min() for _ in range(4)] == [4, 1, 3, 5]
+
+    for key in (-1, 1001, 2.5, "1"):
+        with pytest.raises((ValueError, TypeError)):
+            apq.add(key, None)
+
+    with pytest.raises(ValueError):
+        apq_class(max_key=-1)
@@ -0,0 +1,46 @@
+import gc
+
+from src.timing import TimingStats, measure, percentile
+
+import pytest
+
+
+def test_timing_stats():
+    stats = TimingStats.from_samples([4., 2., 6., 8., 10.], number=2)
+
+    assert stats.min == 1.
+    assert stats.median == 3.
+    assert stats.p95 == pytest.approx(4.8)
+    assert stats.mean == 3.
+    assert stats.stddev == pytest.approx(1.5811, abs=1e-4)
+    assert (stats.repeat, stats.number) == (5, 2)
+
+    assert TimingStats.from_dict(stats.to_dict()) == stats
+
+    single = TimingStats.from_samples([3.])
+    assert single.min == single.p95 == 3.
+    assert single.stddev == 0.
+
+    with pytest.raises(ValueError):
+        TimingStats.from_samples([])
+
+
+def test_percentile():
+    assert percentile([1.], 95) == 1.
+    assert percentile([1., 2., 3.], 50) == 2.
+    assert percentile([1., 2.], 25) == 1.25
+
+
+def test_measure():
+    calls = []
+
+    stats = measure(lambda: calls.append(gc.isenabled()), number=3, repeat=4, warmup=2)
+
+    assert (stats.repeat, stats.number) == (4, 3)
+    assert len(calls) == 14
+    assert not any(calls[2:])
+
+    calls.clear()
+    measure(lambda: calls.append(gc.isenabled()), number=1, repeat=2, disable_gc=False, warmup=0)
+
+    assert calls == [True, True]